@@ -0,0 +1,453 @@
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path, PurePosixPath
+
+# optional deps (py7zr, rarfile) are imported on first use
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+COPY_CHUNK = 1024 * 1024
+PROGRESS_INTERVAL = 0.1     # seconds between progress bar redraws
+BAR_WIDTH = 30
+
+# Parallel extraction (process pool, one archive handle per worker).
+# DATSYS_EXTRACT_WORKERS=N forces a pool size; 1 = always serial.
+EXTRACT_MAX_WORKERS = 8
+IO_WORKERS = 4                      # stored members are disk-bound: more workers only add seeks
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024   # below this, starting processes costs more than it saves
+PARALLEL_MIN_MEMBERS = 64
+CHUNKS_PER_WORKER = 4               # smaller chunks balance load and keep the bar moving
+
+# Hospital CD / PACS exports bundle viewers, autorun files and reports.
+# None of it is DICOM, so it is never written to the project.
+JUNK_NAMES = {"autorun.inf", "desktop.ini", "thumbs.db", ".ds_store"}
+JUNK_DIRS = {"__macosx"}
+JUNK_EXTS = {
+    ".exe", ".dll", ".msi", ".inf", ".ini", ".bat", ".cmd", ".sys", ".ocx",
+    ".cab", ".chm", ".hlp", ".jar", ".htm", ".html", ".js", ".css", ".xml",
+    ".txt", ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".ico",
+}
+
+# --------------------------------------------------
+# MEMBER FILTERING
+# --------------------------------------------------
+
+def is_junk(name: str) -> bool:
+    """
+    name is an archive member / relative path ('/' or '\\' separated).
+    Extensionless and numeric-suffix names (1.2.840...) are never junk.
+    """
+    parts = name.replace("\\", "/").lower().split("/")
+    if any(p in JUNK_DIRS for p in parts[:-1]):
+        return True
+    base = parts[-1]
+    return base in JUNK_NAMES or os.path.splitext(base)[1] in JUNK_EXTS
+
+
+def safe_member_path(target_dir: Path, name: str) -> Path:
+    """
+    Destination for an archive member. Raises on absolute paths, drive
+    letters, '..' and ':' (NTFS streams): the archive could write anywhere.
+    """
+    rel = name.replace("\\", "/")
+    parts = [p for p in PurePosixPath(rel).parts if p not in ("", ".")]
+
+    if rel.startswith("/") or not parts or ".." in parts or any(":" in p for p in parts):
+        raise RuntimeError(f"Unsafe path in archive: {name!r}")
+
+    dst = target_dir.joinpath(*parts)
+    if not dst.resolve().is_relative_to(target_dir.resolve()):
+        raise RuntimeError(f"Unsafe path in archive: {name!r}")
+    return dst
+
+
+def plan_members(target_dir: Path, members, only=None):
+    """
+    members: (key, name, size) for every file in the archive.
+    only: member names to keep (None = all).
+    Validates every path before anything is written.
+    Returns ([(key, dst, size)], skipped_junk_count).
+    """
+    wanted = []
+    skipped = 0
+    for key, name, size in members:
+        dst = safe_member_path(target_dir, name)
+        if only is not None and name not in only:
+            continue
+        if is_junk(name):
+            skipped += 1
+            continue
+        wanted.append((key, dst, size))
+    return wanted, skipped
+
+# --------------------------------------------------
+# PROGRESS
+# --------------------------------------------------
+
+class ExtractProgress:
+    """
+    Progress bar plus throughput: MB/s, files/s, and CPU share of wall
+    time (near 100% = decompression-bound, low = disk / network-bound).
+    The bar is only drawn on a terminal; the summary is always printed.
+    """
+
+    def __init__(self, total_bytes, total_files, skipped=0, show=None):
+        self.total_bytes = total_bytes
+        self.total_files = total_files
+        self.skipped = skipped
+        self.show = sys.stdout.isatty() if show is None else show
+        self.bytes = 0
+        self.files = 0
+        self.t0 = time.perf_counter()
+        self.cpu0 = time.process_time()
+        self._last_draw = 0.0
+
+    def advance(self, nbytes):
+        self.bytes += nbytes
+        self._draw()
+
+    def file_done(self):
+        self.files += 1
+        self._draw()
+
+    def add(self, files, nbytes):
+        """
+        A chunk finished by a pool worker.
+        """
+        self.files += files
+        self.bytes += nbytes
+        self._draw()
+
+    def _rates(self):
+        elapsed = max(time.perf_counter() - self.t0, 1e-9)
+        return elapsed, self.bytes / elapsed / 1e6, self.files / elapsed
+
+    def _draw(self, force=False):
+        if not self.show:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_draw < PROGRESS_INTERVAL:
+            return
+        self._last_draw = now
+
+        frac = self.bytes / self.total_bytes if self.total_bytes else 1.0
+        filled = int(frac * BAR_WIDTH)
+        _, mb_s, files_s = self._rates()
+        print(
+            f"\r[{'#' * filled}{'.' * (BAR_WIDTH - filled)}] {frac:4.0%} "
+            f"{self.files}/{self.total_files} files  {mb_s:6.1f} MB/s  {files_s:6.0f} files/s",
+            end="", flush=True,
+        )
+
+    def finish(self, workers=1):
+        self._draw(force=True)
+        if self.show:
+            print()
+
+        elapsed, mb_s, files_s = self._rates()
+        cpu = (time.process_time() - self.cpu0) / elapsed
+        stats = {
+            "files": self.files,
+            "bytes": self.bytes,
+            "skipped": self.skipped,
+            "seconds": round(elapsed, 3),
+            "mb_s": round(mb_s, 1),
+            "files_s": round(files_s, 1),
+            "cpu": round(cpu, 2),
+            "workers": workers,
+        }
+        # with a pool, CPU time is spent in the workers and not counted here
+        print(
+            f"Extracted {self.files} files ({self.bytes / 1e6:.1f} MB) in {elapsed:.1f}s: "
+            f"{mb_s:.1f} MB/s, {files_s:.0f} files/s, "
+            + (f"CPU {cpu:.0%}" if workers == 1 else f"{workers} workers")
+            + (f", {self.skipped} junk files skipped" if self.skipped else "")
+        )
+        return stats
+
+# --------------------------------------------------
+# PARALLEL PLANNING
+# --------------------------------------------------
+
+def extract_workers(total_bytes, n_members, cpu_bound=True):
+    """
+    Pool size: core count, capped; fewer for stored (disk-bound) data;
+    1 for archives too small to amortize process start-up.
+    """
+    forced = os.environ.get("DATSYS_EXTRACT_WORKERS")
+    if forced:
+        return max(1, int(forced))
+    if total_bytes < PARALLEL_MIN_BYTES or n_members < PARALLEL_MIN_MEMBERS:
+        return 1
+
+    n = min(os.cpu_count() or 1, EXTRACT_MAX_WORKERS)
+    if not cpu_bound:
+        n = min(n, IO_WORKERS)
+    return n
+
+
+def split_by_size(items, n_chunks, size):
+    """
+    Contiguous runs of roughly equal total size (archive order is kept,
+    so each worker reads one region of the file).
+    """
+    total = sum(size(it) for it in items)
+    step = total / max(n_chunks, 1)
+    chunks, current, acc = [], [], 0
+    for it in items:
+        current.append(it)
+        acc += size(it)
+        if len(chunks) < n_chunks - 1 and acc >= step * (len(chunks) + 1):
+            chunks.append(current)
+            current = []
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _run_pool(worker, archive: Path, chunks, workers, progress):
+    """
+    worker(archive_path, chunk) -> (files, bytes), run in a process pool.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(worker, str(archive), chunk) for chunk in chunks]
+        try:
+            for fut in as_completed(futures):
+                progress.add(*fut.result())
+        except BaseException:
+            for fut in futures:
+                fut.cancel()
+            raise
+
+# --------------------------------------------------
+# ZIP / RAR
+# --------------------------------------------------
+
+def _copy_stream(src, dst: Path, progress):
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with open(dst, "wb") as out:
+        while True:
+            chunk = src.read(COPY_CHUNK)
+            if not chunk:
+                break
+            out.write(chunk)
+            progress.advance(len(chunk))
+    progress.file_done()
+
+
+def _zip_chunk(archive_path, chunk):
+    """
+    Pool worker: own ZipFile handle. chunk = [(infolist index, dst)].
+    """
+    progress = ExtractProgress(0, 0, show=False)
+    with zipfile.ZipFile(archive_path, "r") as z:
+        infos = z.infolist()
+        for idx, dst in chunk:
+            with z.open(infos[idx]) as src:
+                _copy_stream(src, Path(dst), progress)
+    return progress.files, progress.bytes
+
+
+def _extract_members(archive, target_dir: Path, show, only=None):
+    """
+    zipfile.ZipFile and rarfile.RarFile share the infolist() / open() API.
+    """
+    infos = [i for i in archive.infolist() if not i.is_dir()]
+    wanted, skipped = plan_members(target_dir, [(i, i.filename, i.file_size) for i in infos], only)
+
+    progress = ExtractProgress(sum(s for _, _, s in wanted), len(wanted), skipped, show)
+    for info, dst, _size in wanted:
+        with archive.open(info) as src:
+            _copy_stream(src, dst, progress)
+    return progress.finish()
+
+
+def _extract_zip(archive: Path, target_dir: Path, show, workers, only=None):
+    with zipfile.ZipFile(archive, "r") as z:
+        infos = z.infolist()
+    members = [(idx, i.filename, i.file_size) for idx, i in enumerate(infos) if not i.is_dir()]
+    wanted, skipped = plan_members(target_dir, members, only)
+    total = sum(s for _, _, s in wanted)
+
+    if workers is None:
+        stored = sum(infos[idx].file_size for idx, _, _ in wanted
+                     if infos[idx].compress_type == zipfile.ZIP_STORED)
+        workers = extract_workers(total, len(wanted), cpu_bound=stored < total / 2)
+    if workers <= 1:
+        with zipfile.ZipFile(archive, "r") as z:
+            return _extract_members(z, target_dir, show, only)
+
+    progress = ExtractProgress(total, len(wanted), skipped, show)
+    chunks = split_by_size(
+        [(idx, str(dst), size) for idx, dst, size in wanted],
+        workers * CHUNKS_PER_WORKER,
+        size=lambda it: it[2],
+    )
+    _run_pool(_zip_chunk, archive, [[(idx, dst) for idx, dst, _ in c] for c in chunks],
+              workers, progress)
+    return progress.finish(workers)
+
+# --------------------------------------------------
+# 7Z
+# --------------------------------------------------
+
+def _write_7z(archive, destinations, progress):
+    """
+    py7zr decompresses solid blocks front to back; a writer factory
+    receives each member's data as it is produced, so it goes straight
+    to disk. Only members in destinations (name -> dst) are written, and
+    blocks holding none of them are skipped by py7zr.
+    """
+    from py7zr.io import Py7zIO, WriterFactory
+
+    class DiskWriter(Py7zIO):
+        def __init__(self, dst):
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            self.f = open(dst, "wb")
+            self.written = 0
+
+        def write(self, s):
+            self.f.write(s)
+            self.written += len(s)
+            progress.advance(len(s))
+            return len(s)
+
+        def read(self, size=None):
+            return b""
+
+        def seek(self, offset, whence=0):
+            return self.f.seek(offset, whence)
+
+        def flush(self):
+            self.f.flush()
+
+        def size(self):
+            return self.written
+
+        def close(self):
+            if not self.f.closed:
+                self.f.close()
+                progress.file_done()
+
+    class DiskWriterFactory(WriterFactory):
+        def __init__(self):
+            self.current = []
+
+        def create(self, filename):
+            # the previous member is complete once the next one starts
+            for w in self.current:
+                w.close()
+            self.current = [DiskWriter(Path(destinations[filename]))]
+            return self.current[0]
+
+    factory = DiskWriterFactory()
+    try:
+        if destinations:
+            archive.extract(targets=list(destinations), factory=factory)
+    finally:
+        for w in factory.current:
+            w.close()
+
+
+def _7z_chunk(archive_path, chunk):
+    """
+    Pool worker: own SevenZipFile handle. chunk = [(name, dst)].
+    """
+    import py7zr
+
+    progress = ExtractProgress(0, 0, show=False)
+    with py7zr.SevenZipFile(archive_path, "r") as z:
+        _write_7z(z, dict(chunk), progress)
+    return progress.files, progress.bytes
+
+
+def _7z_blocks(archive):
+    """
+    Member names per solid block, in archive order. None if this py7zr
+    doesn't expose the block layout (then extraction stays serial).
+    """
+    try:
+        folders = archive.header.main_streams.unpackinfo.folders
+        return [[f.filename for f in (folder.files or [])] for folder in folders]
+    except AttributeError:
+        return None
+
+
+def _extract_7z(archive: Path, target_dir: Path, show, workers, only=None):
+    """
+    A solid block can only be decompressed front to back, so 7z goes
+    parallel only for multi-block archives (non-solid, or solid with a
+    block size limit). Each worker gets whole blocks: splitting a block
+    would make two workers decompress its first part.
+    """
+    import py7zr
+
+    with py7zr.SevenZipFile(archive, "r") as z:
+        blocks = _7z_blocks(z) or []
+        infos = [i for i in z.list() if not i.is_directory]
+        wanted, skipped = plan_members(
+            target_dir, [(i.filename, i.filename, i.uncompressed) for i in infos], only
+        )
+        total = sum(s for _, _, s in wanted)
+        progress = ExtractProgress(total, len(wanted), skipped, show)
+
+        if workers is None:
+            workers = extract_workers(total, len(wanted))
+        workers = min(workers, len(blocks))
+        if workers <= 1:
+            _write_7z(z, {name: dst for name, dst, _ in wanted}, progress)
+            return progress.finish()
+
+    by_name = {name: (str(dst), size) for name, dst, size in wanted}
+    block_members = [
+        [(name, *by_name[name]) for name in block if name in by_name]
+        for block in blocks
+    ]
+    groups = split_by_size(
+        [b for b in block_members if b],
+        workers,
+        size=lambda b: sum(size for _, _, size in b),
+    )
+    chunks = [[(name, dst) for b in group for name, dst, _ in b] for group in groups]
+    _run_pool(_7z_chunk, archive, chunks, len(chunks), progress)
+    return progress.finish(len(chunks))
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+def extract_archive(archive: Path, target_dir: Path, show_progress=None, workers=None, only=None):
+    """
+    Extracts archive members into target_dir, skipping junk and refusing
+    unsafe paths. Returns throughput stats (see ExtractProgress).
+    show_progress=None draws the bar only on a terminal.
+    workers=None sizes the process pool automatically (zip / multi-block
+    7z); 1 streams serially. rar is always serial.
+    only = member names to extract (None = the whole archive).
+    """
+    archive = Path(archive)
+    target_dir = Path(target_dir)
+    ext = archive.suffix.lower()
+
+    if ext == ".zip":
+        return _extract_zip(archive, target_dir, show_progress, workers, only)
+    elif ext == ".7z":
+        return _extract_7z(archive, target_dir, show_progress, workers, only)
+    elif ext == ".rar":
+        import rarfile
+        with rarfile.RarFile(archive, "r") as r:
+            return _extract_members(r, target_dir, show_progress, only)
+    else:
+        raise RuntimeError(f"Unsupported archive format: {ext}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python archive_extract.py <archive> <target_dir>")
+        sys.exit(1)
+    extract_archive(Path(sys.argv[1]), Path(sys.argv[2]))
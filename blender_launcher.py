@@ -1,7 +1,9 @@
 import subprocess
-from utils import update_stage
+from case_session import update_stage
 from pathlib import Path
 
+from perf import timed
+
 # --------------------------------------------------
 # CONFIG
 # --------------------------------------------------
@@ -17,6 +19,7 @@ SCRIPT_NAME = "blender_initialization.py"
 # LAUNCHER
 # --------------------------------------------------
 
+@timed("launch_blender")
 def launch_blender(project_path: str, project_id: str):
     project_dir = Path(project_path)
     blend_file = project_dir / "Blender" / f"{project_id}.blend"
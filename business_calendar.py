@@ -0,0 +1,93 @@
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from utils import DATA_DIR
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+HOLIDAYS_CSV = Path(DATA_DIR) / "holidays.csv"
+
+WEEKMASK = "1111110"    # Mon–Sat are working days
+DUE_LEAD_DAYS = 2       # internal due date = deadline minus N business days
+
+# --------------------------------------------------
+# CALENDAR
+# --------------------------------------------------
+
+def load_holidays(path=HOLIDAYS_CSV):
+    """
+    Returns list of 'YYYY-MM-DD' strings.
+    Format: one date per line, optional TAB + name, '#' for comments.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+
+    holidays = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            holidays.append(line.split("\t", 1)[0].strip())
+
+    return holidays
+
+
+def make_calendar(path=HOLIDAYS_CSV):
+    return np.busdaycalendar(weekmask=WEEKMASK, holidays=load_holidays(path))
+
+# --------------------------------------------------
+# BATCHED QUERIES
+# --------------------------------------------------
+
+def _to_array(dates):
+    """
+    list[date | None] -> (datetime64[D] array, valid mask)
+    None slots are filled with a dummy date and masked out.
+    """
+    valid = np.array([d is not None for d in dates], dtype=bool)
+    arr = np.array(
+        [d if d is not None else date(1970, 1, 1) for d in dates],
+        dtype="datetime64[D]",
+    )
+    return arr, valid
+
+
+def business_days_left(deadlines, today=None, cal=None):
+    """
+    Business days from today (inclusive) to each deadline (exclusive).
+    Past deadlines count as 0, missing deadlines stay None.
+    """
+    if not deadlines:
+        return []
+    if cal is None:
+        cal = make_calendar()
+    if today is None:
+        today = date.today()
+
+    arr, valid = _to_array(deadlines)
+    counts = np.busday_count(np.datetime64(today, "D"), arr, busdaycal=cal)
+    counts = np.maximum(counts, 0)
+
+    return [int(c) if ok else None for c, ok in zip(counts, valid)]
+
+
+def due_dates(deadlines, lead_days=DUE_LEAD_DAYS, cal=None):
+    """
+    Deadline minus lead_days business days, as date (None stays None).
+    A deadline on a non-working day rolls back to the previous working day.
+    """
+    if not deadlines:
+        return []
+    if cal is None:
+        cal = make_calendar()
+
+    arr, valid = _to_array(deadlines)
+    due = np.busday_offset(arr, -lead_days, roll="backward", busdaycal=cal)
+
+    return [d.astype(date) if ok else None for d, ok in zip(due, valid)]
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from utils import MTIME_GRANULARITY_NS, load_json
+from case_session import CaseSession, PEEK_CASE_FILENAME
+from project_allocator import AllocatorLock
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = int(os.environ.get("DATSYS_SERVICE_PORT", "8765"))
+SERVICE_TIMEOUT = 0.3   # seconds; a missing service must not slow anyone down
+WRITE_TIMEOUT = 5.0     # a write that times out may still land: don't retry it directly
+
+# Conditional writers (service, direct fallback) check the ETag and write
+# under this per-project lock, so nobody writes in between.
+UPDATE_LOCK_FILENAME = ".peekCase.lock"
+UPDATE_LOCK_TIMEOUT = 5.0
+
+
+class CaseConflict(RuntimeError):
+    """peekCase.json changed since it was read (ETag mismatch)."""
+
+
+class CaseNotFound(RuntimeError):
+    pass
+
+# --------------------------------------------------
+# DIRECT FILE ACCESS (also used by the service itself)
+# --------------------------------------------------
+
+def _content_hash(peek_path):
+    with open(peek_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def etag_for(peek_path):
+    """
+    Validator from the file itself, so the service and direct readers
+    agree without sharing state: "mtime-size-inode" (every os.replace
+    makes a new inode). A file modified within MTIME_GRANULARITY_NS also
+    gets ":<content hash>", as a same-size rewrite in the same mtime
+    tick can keep all three (shares that report inode 0).
+    """
+    try:
+        st = os.stat(peek_path)
+    except FileNotFoundError:
+        return None
+    tag = f"{st.st_mtime_ns:x}-{st.st_size:x}-{st.st_ino:x}"
+    if time.time_ns() - st.st_mtime_ns < MTIME_GRANULARITY_NS:
+        tag += ":" + _content_hash(peek_path)
+    return f'"{tag}"'
+
+
+def etag_matches(etag, peek_path) -> bool:
+    """
+    etag still describes the file. A hash taken inside the mtime window
+    is checked against the content even after the window has passed.
+    """
+    current = etag_for(peek_path)
+    if not etag or current is None:
+        return False
+    stat, _, digest = etag.strip('"').partition(":")
+    current_stat, _, current_digest = current.strip('"').partition(":")
+    if stat != current_stat:
+        return False
+    return not digest or digest == (current_digest or _content_hash(peek_path))
+
+
+def direct_get(project_dir):
+    peek_path = Path(project_dir) / PEEK_CASE_FILENAME
+    etag = etag_for(peek_path)
+    if etag is None:
+        raise CaseNotFound(f"No {PEEK_CASE_FILENAME} in {project_dir}")
+    return load_json(peek_path, {}), etag
+
+
+def direct_update(project_dir, fields, etag, source="datsys", user=None):
+    """
+    Applies fields only if the file still matches etag; check and write
+    happen under the project's update lock.
+    Returns the new etag.
+    """
+    peek_path = Path(project_dir) / PEEK_CASE_FILENAME
+    if not peek_path.exists():
+        raise CaseNotFound(f"No {PEEK_CASE_FILENAME} in {project_dir}")
+
+    with AllocatorLock(project_dir, UPDATE_LOCK_TIMEOUT, UPDATE_LOCK_FILENAME):
+        if not peek_path.exists():
+            raise CaseNotFound(f"No {PEEK_CASE_FILENAME} in {project_dir}")
+        if not etag_matches(etag, peek_path):
+            raise CaseConflict(f"{Path(project_dir).name} changed since it was read, reload first")
+
+        with CaseSession(project_dir) as case:
+            case.set(**fields)
+            case.event("PEEK", "Fields updated: " + ", ".join(fields), source=source, user=user)
+
+        return etag_for(peek_path)
+
+# --------------------------------------------------
+# SERVICE CLIENT (falls back to direct access)
+# --------------------------------------------------
+
+def _request(method, path, body=None, headers=None, timeout=SERVICE_TIMEOUT):
+    url = f"http://{SERVICE_HOST}:{SERVICE_PORT}{path}"
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    return urllib.request.urlopen(req, timeout=timeout)
+
+
+def get_case(project_dir):
+    """
+    Returns (peekCase dict, etag).
+    """
+    project_id = Path(project_dir).name
+    try:
+        with _request("GET", f"/projects/{project_id}") as resp:
+            return json.load(resp), resp.headers["ETag"]
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            raise CaseNotFound(project_id) from None
+        raise
+    except OSError:
+        pass  # service not running: URLError / refused / timeout
+    return direct_get(project_dir)
+
+
+def update_case(project_dir, fields, etag, source="datsys", user=None):
+    """
+    Conditional update (If-Match). Returns the new etag.
+    Raises CaseConflict if someone else wrote the case in between.
+    user=None logs the OS user.
+    """
+    project_id = Path(project_dir).name
+    try:
+        with _request(
+            "PATCH",
+            f"/projects/{project_id}",
+            body={"fields": fields, "source": source, "user": user},
+            headers={"If-Match": etag},
+            timeout=WRITE_TIMEOUT,
+        ) as resp:
+            return resp.headers["ETag"]
+    except urllib.error.HTTPError as e:
+        if e.code == 412:
+            raise CaseConflict(f"{project_id} changed since it was read, reload first") from None
+        if e.code == 404:
+            raise CaseNotFound(project_id) from None
+        raise
+    except urllib.error.URLError as e:
+        if not isinstance(e.reason, ConnectionRefusedError):
+            raise
+    except ConnectionRefusedError:
+        pass
+    # service not running
+    return direct_update(project_dir, fields, etag, source, user)
+
+
+def list_projects():
+    """
+    Catalog summary from the service, or None if it is not running.
+    """
+    try:
+        with _request("GET", "/projects") as resp:
+            return json.load(resp)
+    except urllib.error.HTTPError:
+        raise
+    except OSError:
+        return None
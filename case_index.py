@@ -0,0 +1,174 @@
+import os
+import sqlite3
+
+from scanner import PEEK_CASE_FILENAME, scan_peek_cases, stream_map
+from utils import CLIENTS_DIR, DATA_DIR, ensure_dir, load_json
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# The index is a cache. The clients/ tree stays the source of truth and the
+# index file can be deleted or rebuilt at any time.
+INDEX_PATH = os.path.join(DATA_DIR, "case_index.sqlite")
+
+TIMELINE_COLUMNS = (
+    "request_date",
+    "deadline",
+    "surgery",
+    "region",
+    "complexity",
+    "stage",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    project_id   TEXT PRIMARY KEY,
+    client_id    TEXT NOT NULL,
+    peek_path    TEXT NOT NULL,
+    mtime_ns     INTEGER NOT NULL,
+    size         INTEGER NOT NULL,
+    request_date TEXT NOT NULL,
+    deadline     TEXT NOT NULL,
+    surgery      TEXT NOT NULL,
+    region       TEXT NOT NULL,
+    complexity   TEXT NOT NULL,
+    stage        TEXT NOT NULL
+)
+"""
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+def connect(path=INDEX_PATH):
+    ensure_dir(os.path.dirname(path))
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute(SCHEMA)
+    return conn
+
+
+def case_columns(peek):
+    """
+    peekCase.json -> timeline columns
+    """
+    return {
+        "request_date": peek.get("creado_en", "")[:10],
+        "deadline": peek.get("fecha_entrega_estimada", ""),
+        "surgery": peek.get("fecha_cirugia", ""),
+        "region": peek.get("region", ""),
+        "complexity": peek.get("complejidad", ""),
+        "stage": peek.get("estado_caso", ""),
+    }
+
+# --------------------------------------------------
+# REFRESH / REBUILD
+# --------------------------------------------------
+
+def _parse_case(item):
+    client_id, project_id, peek_path, st = item
+    return item, case_columns(load_json(peek_path, {}))
+
+
+def _upsert(conn, item, cols):
+    client_id, project_id, peek_path, st = item
+    conn.execute(
+        "INSERT OR REPLACE INTO cases VALUES "
+        "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            project_id,
+            client_id,
+            peek_path,
+            st.st_mtime_ns,
+            st.st_size,
+            *(cols[c] for c in TIMELINE_COLUMNS),
+        ),
+    )
+
+
+def _rows(conn):
+    return [
+        {"project_id": r["project_id"], **{c: r[c] for c in TIMELINE_COLUMNS}}
+        for r in conn.execute("SELECT * FROM cases")
+    ]
+
+
+def refresh_index(clients_dir=CLIENTS_DIR, index_path=INDEX_PATH, progress=None):
+    """
+    Sync the index with the filesystem and return the timeline rows.
+
+    Only projects whose peekCase.json changed (mtime or size) since the last
+    refresh are parsed again. Projects that disappeared are dropped.
+    progress(n) is called as cases stream in from the scanner.
+    """
+    conn = connect(index_path)
+    try:
+        known = {
+            r["project_id"]: (r["mtime_ns"], r["size"])
+            for r in conn.execute("SELECT project_id, mtime_ns, size FROM cases")
+        }
+        seen = set()
+        changed = []
+
+        for item in scan_peek_cases(clients_dir):
+            client_id, project_id, peek_path, st = item
+            seen.add(project_id)
+            if progress:
+                progress(len(seen))
+            if known.get(project_id) != (st.st_mtime_ns, st.st_size):
+                changed.append(item)
+
+        with conn:
+            for item, cols in stream_map(_parse_case, changed):
+                _upsert(conn, item, cols)
+
+            gone = [(pid,) for pid in known if pid not in seen]
+            conn.executemany("DELETE FROM cases WHERE project_id = ?", gone)
+
+        return _rows(conn)
+    finally:
+        conn.close()
+
+
+def update_cases(project_dirs, index_path=INDEX_PATH):
+    """
+    Re-reads only the given project folders (e.g. from a file watcher)
+    and returns all timeline rows, without walking the tree.
+    """
+    conn = connect(index_path)
+    try:
+        with conn:
+            for project_dir in project_dirs:
+                project_dir = os.path.normpath(project_dir)
+                project_id = os.path.basename(project_dir)
+                client_id = os.path.basename(os.path.dirname(project_dir))
+                peek_path = os.path.join(project_dir, PEEK_CASE_FILENAME)
+                try:
+                    st = os.stat(peek_path)
+                except (FileNotFoundError, NotADirectoryError):
+                    conn.execute("DELETE FROM cases WHERE project_id = ?", (project_id,))
+                    continue
+                _upsert(conn, *_parse_case((client_id, project_id, peek_path, st)))
+
+        return _rows(conn)
+    finally:
+        conn.close()
+
+
+def rebuild_index(clients_dir=CLIENTS_DIR, index_path=INDEX_PATH, progress=None):
+    """
+    Drop the index and re-read every peekCase.json from disk.
+    """
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    return refresh_index(clients_dir, index_path, progress)
+
+
+# --------------------------------------------------
+# CLI ENTRY
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    rows = rebuild_index()
+    print(f"[OK] Case index rebuilt: {len(rows)} cases -> {INDEX_PATH}")
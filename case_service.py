@@ -0,0 +1,223 @@
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from case_client import (
+    SERVICE_HOST,
+    SERVICE_PORT,
+    CaseConflict,
+    CaseNotFound,
+    direct_get,
+    direct_update,
+    etag_for,
+)
+from scanner import PEEK_CASE_FILENAME, iter_projects, iter_subdirs
+from utils import CLIENTS_DIR, load_json
+
+# --------------------------------------------------
+# CATALOG
+# --------------------------------------------------
+
+class Catalog:
+    """
+    In-memory map of clients and projects. peekCase.json contents are
+    cached per project and re-validated against the file's ETag (mtime,
+    size) on every read, so edits made behind the service's back (Blender,
+    a text editor) are always seen. Files stay the source of truth.
+    """
+
+    def __init__(self, clients_dir=CLIENTS_DIR):
+        self.clients_dir = clients_dir
+        self.lock = threading.Lock()
+        self.projects = {}  # project_id -> project_dir
+        self.cache = {}     # project_id -> (etag, data)
+        self.reload()
+
+    def reload(self):
+        projects = {p.name: p.path for _c, p in iter_projects(self.clients_dir)}
+        with self.lock:
+            self.projects = projects
+            self.cache.clear()
+
+    def clients(self):
+        out = []
+        for c in iter_subdirs(self.clients_dir):
+            data = load_json(os.path.join(c.path, f"client_{c.name}.json"), {})
+            out.append({"id": c.name, "name": data.get("name", ""),
+                        "project_count": data.get("project_count", 0)})
+        return out
+
+    def project_dir(self, project_id):
+        with self.lock:
+            path = self.projects.get(project_id)
+        if path and os.path.isdir(path):
+            return path
+
+        # created after startup: resolve from the ID (<DATE>-<CLIENT>-<TYPE><N>)
+        parts = project_id.split("-")
+        if len(parts) >= 3:
+            path = os.path.join(self.clients_dir, parts[1], project_id)
+            if os.path.isdir(path):
+                with self.lock:
+                    self.projects[project_id] = path
+                return path
+        raise CaseNotFound(project_id)
+
+    def get(self, project_id):
+        path = self.project_dir(project_id)
+        etag = etag_for(os.path.join(path, PEEK_CASE_FILENAME))
+        if etag is None:
+            raise CaseNotFound(project_id)
+
+        with self.lock:
+            hit = self.cache.get(project_id)
+        if hit and hit[0] == etag:
+            return hit[1], etag
+
+        data, etag = direct_get(path)
+        with self.lock:
+            self.cache[project_id] = (etag, data)
+        return data, etag
+
+    def update(self, project_id, fields, etag, source, user=None):
+        path = self.project_dir(project_id)
+        with self.lock:     # serialize writers inside the service
+            new_etag = direct_update(path, fields, etag, source, user)
+            self.cache.pop(project_id, None)
+        return new_etag
+
+    def summary(self):
+        out = []
+        with self.lock:
+            ids = sorted(self.projects)
+        for project_id in ids:
+            try:
+                data, etag = self.get(project_id)
+            except CaseNotFound:
+                continue
+            out.append({
+                "project_id": project_id,
+                "client_id": Path(self.projects[project_id]).parent.name,
+                "etag": etag,
+                "estado_caso": data.get("estado_caso", ""),
+                "fecha_entrega_estimada": data.get("fecha_entrega_estimada", ""),
+                "nombre_paciente": data.get("nombre_paciente", ""),
+            })
+        return out
+
+# --------------------------------------------------
+# HTTP
+# --------------------------------------------------
+
+RE_PROJECT = re.compile(r"^/projects/([^/]+)$")
+
+
+class CaseHandler(BaseHTTPRequestHandler):
+    catalog = None  # set by make_server
+
+    def log_message(self, fmt, *args):
+        pass  # keep the terminal quiet; errors are returned to the caller
+
+    def _send(self, code, body=None, etag=None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else b""
+        self.send_response(code)
+        if etag:
+            self.send_header("ETag", etag)
+        if body is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        try:
+            if self.path == "/health":
+                return self._send(200, {"ok": True})
+            if self.path == "/clients":
+                return self._send(200, self.catalog.clients())
+            if self.path == "/projects":
+                return self._send(200, self.catalog.summary())
+
+            m = RE_PROJECT.match(self.path)
+            if not m:
+                return self._send(404, {"error": "not found"})
+
+            data, etag = self.catalog.get(m.group(1))
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, etag=etag)
+            self._send(200, data, etag)
+        except CaseNotFound as e:
+            self._send(404, {"error": f"project not found: {e}"})
+
+    def do_POST(self):
+        if self.path != "/reload":
+            return self._send(404, {"error": "not found"})
+        self.catalog.reload()
+        self._send(200, {"ok": True})
+
+    def do_PATCH(self):
+        m = RE_PROJECT.match(self.path)
+        if not m:
+            return self._send(404, {"error": "not found"})
+
+        etag = self.headers.get("If-Match")
+        if not etag:
+            return self._send(428, {"error": "If-Match required"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("body must be an object")
+            fields = body["fields"]
+            if not isinstance(fields, dict):
+                raise ValueError("fields must be an object")
+            user = body.get("user")
+            if user is not None and not isinstance(user, str):
+                raise ValueError("user must be a string")
+        except (ValueError, KeyError) as e:
+            return self._send(400, {"error": f"bad request: {e}"})
+
+        try:
+            new_etag = self.catalog.update(m.group(1), fields, etag, body.get("source", "service"), user)
+        except CaseNotFound as e:
+            return self._send(404, {"error": f"project not found: {e}"})
+        except CaseConflict as e:
+            return self._send(412, {"error": str(e)})
+        except RuntimeError as e:
+            return self._send(503, {"error": str(e)})   # update lock busy
+
+        self._send(200, {"ok": True}, new_etag)
+
+
+def make_server(clients_dir=CLIENTS_DIR, host=SERVICE_HOST, port=SERVICE_PORT):
+    """
+    Builds the server without starting it. port=0 picks a free port
+    (server.server_address[1]), handy for running it in-process.
+    """
+    handler = type("BoundCaseHandler", (CaseHandler,), {"catalog": Catalog(clients_dir)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_in_background(clients_dir=CLIENTS_DIR, port=0):
+    server = make_server(clients_dir, port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve(clients_dir=CLIENTS_DIR, port=SERVICE_PORT):
+    server = make_server(clients_dir, port=port)
+    print(f"[OK] Case service on http://{SERVICE_HOST}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
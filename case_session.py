@@ -0,0 +1,102 @@
+import copy
+from pathlib import Path
+
+from utils import load_json, save_json, FSYNC_POLICY, now_iso
+from event_log import make_event, append_events
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+PEEK_CASE_FILENAME = "peekCase.json"
+
+# --------------------------------------------------
+# SESSION
+# --------------------------------------------------
+
+class CaseSession:
+    """
+    Batches peekCase.json field updates and log events for one project.
+
+    Nothing touches disk until commit(): peekCase.json is written once,
+    atomically (temp file + os.replace), then all events are appended
+    to Log.jsonl in a single write. Used as a context manager it commits
+    on success and discards everything if the block raises.
+
+        with CaseSession(project_dir) as case:
+            case.set(nombre_paciente="...")
+            case.stage("Design")
+    """
+
+    def __init__(self, project_dir, fsync=None):
+        self.project_dir = Path(project_dir)
+        self.peek_path = self.project_dir / PEEK_CASE_FILENAME
+        self.fsync = fsync or FSYNC_POLICY
+
+        self.exists = self.peek_path.exists()
+        self.data = load_json(self.peek_path, {})
+        self._original = copy.deepcopy(self.data)
+        self._events = []
+
+    # ---- fields ----
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, **fields):
+        self.data.update(fields)
+
+    def set_if_empty(self, key, value):
+        if value and not self.data.get(key):
+            self.data[key] = value
+
+    # ---- log ----
+
+    def event(self, event, message="", stage="", source="datsys", user=None):
+        self._events.append(make_event(event, message, stage, user=user, source=source))
+
+    def log(self, message):
+        self.event("LOG", message)
+
+    def stage(self, stage, message=None):
+        self.data["estado_caso"] = stage
+        self.event("STAGE", message, stage)
+
+    # ---- write ----
+
+    @property
+    def dirty(self):
+        return self.data != self._original
+
+    def commit(self):
+        if self.dirty:
+            self.data["actualizado_en"] = now_iso()
+            save_json(self.peek_path, self.data, self.fsync)
+            self._original = copy.deepcopy(self.data)
+            self.exists = True
+
+        if self._events:
+            append_events(self.project_dir, self._events, self.fsync)
+            self._events = []
+
+    def discard(self):
+        self.data = copy.deepcopy(self._original)
+        self._events = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+# --------------------------------------------------
+# SHORTCUTS
+# --------------------------------------------------
+
+def update_stage(project_dir, stage, message=None):
+    with CaseSession(project_dir) as case:
+        case.stage(stage, message)
@@ -1,10 +1,12 @@
 import os
-import shutil
+import sys
+import csv
+import json
+import argparse
 from pathlib import Path
-from timeline import show_timeline
 
-
-from dicom_ingestion import ingest_dicom
+# Heavy modules (timeline -> numpy, dicom_ingestion -> pydicom / py7zr /
+# rarfile) are imported where they are used, so the menu shows instantly.
 from utils import (
     CLIENTS_DIR,
     ensure_dir,
@@ -13,8 +15,11 @@ from utils import (
     save_json,
     now_iso,
     date_code_base36,
-    update_stage,
 )
+from case_session import update_stage
+from project_allocator import allocate_suffix, reserve_suffixes
+from template_materializer import materialize_template
+from perf import span, timed
 
 # --------------------------------------------------
 # CONFIG
@@ -59,6 +64,12 @@ def select_from_list(items, title):
 # --------------------------------------------------
 
 def project_menu(client_id, project_id, project_path):
+    from event_log import has_legacy_log, convert_legacy_log
+    # projects from before Log.jsonl: merge Log.txt in (adds nothing once done)
+    if has_legacy_log(project_path):
+        with span("convert_legacy_log") as info:
+            info["events"] = convert_legacy_log(project_path)
+
     while True:
         print("\n==============================")
         print(f"Client:  {client_id}")
@@ -66,7 +77,7 @@ def project_menu(client_id, project_id, project_path):
         print("==============================")
 
         print("[1] Open project folder")
-        print("[2] Open LOG.txt")
+        print("[2] Show log")
         print("[3] PEEK Case Info")
         print("[4] Ingest DICOM")
         print("[5] Open in 3D Slicer")
@@ -75,19 +86,28 @@ def project_menu(client_id, project_id, project_path):
 
         choice = prompt("> ").lower()
 
+        # ingest and the launchers record their own spans
         if choice == "1":
-            os.startfile(project_path)
+            with span("open_folder"):
+                os.startfile(project_path)
 
         elif choice == "2":
-            log_path = Path(project_path) / "Log.txt"
-            log_path.touch(exist_ok=True)
-            os.startfile(log_path)
+            from event_log import iter_events, format_event
+            print()
+            with span("show_log") as info:
+                n = 0
+                for rec in iter_events(project_path):
+                    print(format_event(rec))
+                    n += 1
+                info["events"] = n
+            prompt("\nPress ENTER to return...")
 
         elif choice == "3":
             from peek import prompt_peek_case
             prompt_peek_case(project_path)
 
         elif choice == "4":
+            from dicom_ingestion import ingest_dicom
             ingest_dicom(project_path)
 
         elif choice == "5":
@@ -105,73 +125,53 @@ def project_menu(client_id, project_id, project_path):
 # NEW PROJECT
 # --------------------------------------------------
 
-def new_project():
-    ensure_dir(CLIENTS_DIR)
+PROJECT_TYPES = ("PK", "PL", "AR")
 
-    client_id = prompt("Enter client ID: ").upper()
-    if not client_id:
-        return
 
+def create_client(client_id, name="", contact=""):
     client_dir = Path(CLIENTS_DIR) / client_id
-    client_json_path = client_dir / f"client_{client_id}.json"
+    client_dir.mkdir(parents=True)
+    save_json(client_dir / f"client_{client_id}.json", {
+        "id": client_id,
+        "name": name,
+        "contact": contact,
+        "created_at": now_iso(),
+        "project_count": 0,
+    })
+    return client_dir
+
+
+@timed("new_project")
+def create_project(client_id, project_type, suffix=None):
+    """
+    Non-interactive project creation. Client must exist.
+    suffix comes from reserve_suffixes() for batches; None allocates one.
+    Returns (project_id, project_dir).
+    """
+    if project_type not in PROJECT_TYPES:
+        raise RuntimeError(f"Unknown project type: {project_type}")
 
+    client_dir = Path(CLIENTS_DIR) / client_id
     if not client_dir.exists():
-        print("New client detected.")
-        name = prompt("Client full name: ")
-        contact = prompt("Contact info: ")
-
-        client_dir.mkdir(parents=True)
-        save_json(client_json_path, {
-            "id": client_id,
-            "name": name,
-            "contact": contact,
-            "created_at": now_iso(),
-            "project_count": 0,
-        })
-    else:
-        client = load_json(client_json_path, {})
-        print(f"Client found: {client.get('name','')} ({client_id})")
-        if prompt("Continue? [y/N]: ").lower() != "y":
-            return
-
-    print("\nProject type:")
-    print("[1] PK - PEEK")
-    print("[2] PL - PLA")
-    print("[3] AR - Archive")
-
-    t = prompt("> ")
-    type_map = {"1": "PK", "2": "PL", "3": "AR"}
-    if t not in type_map:
-        return
-
-    project_type = type_map[t]
+        raise RuntimeError(f"Client not found: {client_id}")
 
-    client = load_json(client_json_path, {})
-    suffix = client.get("project_count", 0) + 1
-    client["project_count"] = suffix
-    save_json(client_json_path, client)
+    if suffix is None:
+        suffix = allocate_suffix(client_id)
 
     date_code = date_code_base36()
     project_id = f"{date_code}-{client_id}-{project_type}{suffix}"
     project_dir = client_dir / project_id
     project_dir.mkdir()
 
-    # ---- TEMPLATE COPY ----
+    # ---- TEMPLATE (reflink / hardlink / copy, PEEK.blend renamed) ----
     if project_type == "PK":
         if not PEEK_TEMPLATE_DIR.exists():
             raise RuntimeError("PEEK template folder missing")
-        shutil.copytree(
+        materialize_template(
             PEEK_TEMPLATE_DIR,
             project_dir,
-            dirs_exist_ok=True
+            renames={"Blender/PEEK.blend": f"Blender/{project_id}.blend"},
         )
-    # ---- RENAME PEEK BLEND TEMPLATE ----
-    if project_type == "PK":
-        old_blend = project_dir / "Blender" / "PEEK.blend"
-        new_blend = project_dir / "Blender" / f"{project_id}.blend"
-
-        if old_blend.exists() and not new_blend.exists():
-            old_blend.rename(new_blend)
 
     # ---- CASE METADATA ----
     save_json(
@@ -185,6 +185,41 @@ def new_project():
     )
 
     update_stage(project_dir, "NEW")
+    return project_id, project_dir
+
+
+def new_project():
+    ensure_dir(CLIENTS_DIR)
+
+    client_id = prompt("Enter client ID: ").upper()
+    if not client_id:
+        return
+
+    client_dir = Path(CLIENTS_DIR) / client_id
+    client_json_path = client_dir / f"client_{client_id}.json"
+
+    if not client_dir.exists():
+        print("New client detected.")
+        name = prompt("Client full name: ")
+        contact = prompt("Contact info: ")
+        create_client(client_id, name, contact)
+    else:
+        client = load_json(client_json_path, {})
+        print(f"Client found: {client.get('name','')} ({client_id})")
+        if prompt("Continue? [y/N]: ").lower() != "y":
+            return
+
+    print("\nProject type:")
+    print("[1] PK - PEEK")
+    print("[2] PL - PLA")
+    print("[3] AR - Archive")
+
+    t = prompt("> ")
+    type_map = {"1": "PK", "2": "PL", "3": "AR"}
+    if t not in type_map:
+        return
+
+    project_id, project_dir = create_project(client_id, type_map[t])
 
     print(f"\nProject created: {project_id}")
     project_menu(client_id, project_id, project_dir)
@@ -193,6 +228,16 @@ def new_project():
 # OPEN PROJECT
 # --------------------------------------------------
 
+def project_path_for(project_id):
+    """
+    Q113-PSO-PK6 -> clients/PSO/Q113-PSO-PK6
+    """
+    parts = project_id.split("-")
+    if len(parts) < 3:
+        raise RuntimeError(f"Invalid project ID: {project_id}")
+    return Path(CLIENTS_DIR) / parts[1] / project_id
+
+
 def open_project():
     clients = list_dirs(CLIENTS_DIR)
     client_id = select_from_list(clients, "Select client")
@@ -218,18 +263,20 @@ def main():
     while True:
         print("\n=== DATSYS ===")
         print("[0] View Timeline")
+        print("[W] Watch Timeline (live)")
         print("[1] New project")
         print("[2] Open project")
+        print("[L] Query logs")
         print("[3] Exit")
 
         choice = prompt("> ")
 
         if choice == "0":
+            from timeline import show_timeline
             project_id = show_timeline()
             if project_id:
                 client_id = project_id.split("-")[1]
-                project_dir = Path(CLIENTS_DIR) / client_id / project_id
-                project_menu(client_id, project_id, project_dir)
+                project_menu(client_id, project_id, project_path_for(project_id))
 
         elif choice == "1":
             new_project()
@@ -237,8 +284,306 @@ def main():
         elif choice == "2":
             open_project()
 
+        elif choice.lower() == "w":
+            from timeline_watch import watch_timeline
+            watch_timeline()
+
+        elif choice.lower() == "l":
+            from log_query import query_interactive
+            query_interactive()
+
         elif choice == "3":
             break
 
+# --------------------------------------------------
+# SCRIPTED CLI (no prompts)
+# --------------------------------------------------
+
+def _existing_project(project_id):
+    project_dir = project_path_for(project_id)
+    if not project_dir.exists():
+        raise RuntimeError(f"Project not found: {project_id}")
+    return project_dir
+
+
+def _parse_value(raw):
+    # numbers / true / false as JSON, anything else as plain text
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def cmd_new_project(args):
+    client_dir = Path(CLIENTS_DIR) / args.client
+    if not client_dir.exists():
+        if args.name is None:
+            raise RuntimeError(f"Client not found: {args.client} (pass --name to create it)")
+        create_client(args.client, args.name, args.contact)
+
+    for suffix in reserve_suffixes(args.client, args.count):
+        project_id, _ = create_project(args.client, args.type, suffix)
+        print(project_id)
+
+
+def _ingest_pairs(pairs):
+    """
+    [(project_id, source)]; every pair is checked before any ingest runs.
+    """
+    parsed = []
+    for pair in pairs:
+        project_id, sep, source = pair.partition("=")
+        if not sep or not project_id or not source:
+            raise RuntimeError(f"Expected PROJECT=SOURCE, got: {pair}")
+        parsed.append((project_id, source))
+    return parsed
+
+
+def cmd_ingest(args):
+    pairs = _ingest_pairs(args.jobs)
+    if args.workers > 1 or args.report:
+        return _ingest_batch(args, pairs)
+    return _ingest_jobs(args, pairs)
+
+
+def _ingest_jobs(args, pairs):
+    from dicom_ingestion import ingest_dicom
+
+    for project_id, source in pairs:
+        yield project_id, lambda p=project_id, s=source: ingest_dicom(
+            _existing_project(p), source=s, replace=args.replace, lazy=args.lazy or None,
+            compact=args.compact,
+        )
+
+
+def _ingest_batch(args, pairs):
+    """
+    -j N (or --report): all projects on a process pool, then one table.
+    """
+    from dicom_ingestion import ingest_batch
+
+    # bad project IDs fail up front, before any worker starts
+    jobs = [(p, _existing_project(p), s) for p, s in pairs]
+    results = ingest_batch(jobs, args.replace, args.lazy or None, args.workers, args.compact)
+    if args.report:
+        Path(args.report).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"[OK] Report written: {args.report}")
+    failed = [r["project"] for r in results if r["status"] != "ok"]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(results)} not ingested: {', '.join(failed)}")
+
+
+def cmd_compact(args):
+    from dicom_compact import compact_case
+
+    for project_id in args.projects:
+        yield project_id, lambda p=project_id: compact_case(_existing_project(p))
+
+
+def cmd_set_stage(args):
+    for project_id in args.projects:
+        yield project_id, lambda p=project_id: update_stage(
+            _existing_project(p), args.stage, args.message
+        )
+
+
+def cmd_peek_set(args):
+    from peek import init_peek_case
+    from case_client import get_case, update_case, CaseNotFound
+
+    fields = {}
+    for item in args.set:
+        key, sep, raw = item.partition("=")
+        if not sep:
+            raise RuntimeError(f"Expected key=value, got: {item}")
+        fields[key] = _parse_value(raw)
+
+    def run(project_id):
+        # through the case service when it runs, direct file access otherwise
+        project_dir = _existing_project(project_id)
+        try:
+            _, etag = get_case(project_dir)
+        except CaseNotFound:
+            init_peek_case(project_dir)
+            _, etag = get_case(project_dir)
+        update_case(project_dir, fields, etag)
+
+    for project_id in args.projects:
+        yield project_id, lambda p=project_id: run(p)
+
+
+def cmd_serve(args):
+    from case_service import serve, SERVICE_PORT
+    serve(port=args.port or SERVICE_PORT)
+
+
+def cmd_watch_inbox(args):
+    from dicom_staging import watch_inbox, INBOX_DIR
+    watch_inbox(args.inbox or INBOX_DIR)
+
+
+def cmd_timeline(args):
+    if args.watch:
+        from timeline_watch import watch_timeline
+        watch_timeline()
+        return
+
+    from timeline import timeline_rows
+
+    rows = timeline_rows()
+    cols = ["project_id", "request_date", "deadline", "due", "days_left",
+            "surgery", "region", "complexity", "stage"]
+
+    if args.format == "json":
+        print(json.dumps([{c: r[c] for c in cols} for r in rows], indent=2, ensure_ascii=False))
+    else:
+        w = csv.DictWriter(sys.stdout, fieldnames=cols, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(rows)
+
+
+def cmd_launch(args):
+    def run(project_id):
+        project_dir = _existing_project(project_id)
+        if args.app == "slicer":
+            from slicer_launcher import launch_slicer_with_dicom
+            launch_slicer_with_dicom(project_dir / "DICOM")
+        else:
+            from blender_launcher import launch_blender
+            launch_blender(project_dir, project_id)
+
+    for project_id in args.projects:
+        yield project_id, lambda p=project_id: run(p)
+
+
+def cmd_query(args):
+    from log_query import print_query
+    print_query(
+        event=args.event, stage=args.stage, project=args.project,
+        user=args.user, since=args.since, until=args.until, last=args.last,
+    )
+
+
+def cmd_perf(args):
+    from perf import print_report
+    print_report(op=args.op, since=args.since)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="datsys.py",
+        description="DATSYS scripted commands. Run without arguments for the menu.",
+    )
+    # handled in __main__ (before parsing) so it also works for the menu
+    parser.add_argument("--profile", action="store_true",
+                        help="write a cProfile dump of this run to data/*.pstats")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("new-project", help="create N projects for one client")
+    p.add_argument("client", type=str.upper)
+    p.add_argument("type", type=str.upper, choices=PROJECT_TYPES)
+    p.add_argument("-n", "--count", type=int, default=1)
+    p.add_argument("--name", help="create the client with this name if missing")
+    p.add_argument("--contact", default="")
+    p.set_defaults(func=cmd_new_project)
+
+    p = sub.add_parser("ingest", help="ingest DICOM: PROJECT=SOURCE ...")
+    p.add_argument("jobs", nargs="+", metavar="PROJECT=SOURCE")
+    p.add_argument("--replace", action="store_true", help="replace existing DICOM folders")
+    p.add_argument("--lazy", action="store_true",
+                   help="keep archives as the DICOM store, extract series on demand")
+    p.add_argument("-j", "--workers", type=int, default=1,
+                   help="ingest this many projects at once (process pool)")
+    p.add_argument("--report", help="write the batch results as JSON here (runs the batch path)")
+    p.add_argument("--compact", action="store_true", help="pack DICOM/ into DICOM.zip afterwards")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("compact", help="pack DICOM/ of many projects into DICOM.zip (lossless)")
+    p.add_argument("projects", nargs="+")
+    p.set_defaults(func=cmd_compact)
+
+    p = sub.add_parser("set-stage", help="set estado_caso on many projects")
+    p.add_argument("stage")
+    p.add_argument("projects", nargs="+")
+    p.add_argument("-m", "--message")
+    p.set_defaults(func=cmd_set_stage)
+
+    p = sub.add_parser("peek-set", help="set peekCase.json fields on many projects")
+    p.add_argument("projects", nargs="+")
+    p.add_argument("--set", action="append", required=True, metavar="KEY=VALUE")
+    p.set_defaults(func=cmd_peek_set)
+
+    p = sub.add_parser("timeline", help="print the timeline as JSON or CSV")
+    p.add_argument("--format", choices=("json", "csv"), default="json")
+    p.add_argument("--watch", action="store_true", help="live table, redrawn on changes")
+    p.set_defaults(func=cmd_timeline)
+
+    p = sub.add_parser("launch", help="open projects in Slicer or Blender")
+    p.add_argument("app", choices=("slicer", "blender"))
+    p.add_argument("projects", nargs="+")
+    p.set_defaults(func=cmd_launch)
+
+    p = sub.add_parser("serve", help="run the local case service (HTTP on localhost)")
+    p.add_argument("--port", type=int, help="default: DATSYS_SERVICE_PORT or 8765")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("watch-inbox", help="pre-extract downloaded archives into clients/.staging")
+    p.add_argument("--inbox", help="default: DATSYS_INBOX or ~/Downloads")
+    p.set_defaults(func=cmd_watch_inbox)
+
+    p = sub.add_parser("query", help="search case logs")
+    p.add_argument("--event", type=str.upper)
+    p.add_argument("--stage")
+    p.add_argument("--project")
+    p.add_argument("--user")
+    p.add_argument("--since", metavar="YYYY-MM-DD")
+    p.add_argument("--until", metavar="YYYY-MM-DD")
+    p.add_argument("--last", type=int)
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("perf", help="timing report (p50 / p95) from data/perf.jsonl")
+    p.add_argument("--op", help="only this operation")
+    p.add_argument("--since", metavar="YYYY-MM-DD")
+    p.set_defaults(func=cmd_perf)
+
+    return parser
+
+
+def cli(argv):
+    """
+    Multi-target commands yield (target, job) pairs: every target runs even
+    if an earlier one fails, and the exit code reports whether any failed.
+    """
+    args = build_parser().parse_args(argv)
+    ensure_dir(CLIENTS_DIR)
+
+    try:
+        jobs = args.func(args)
+        if jobs is None:
+            return 0
+        failed = 0
+        for target, job in jobs:
+            try:
+                job()
+                print(f"[OK] {target}")
+            except Exception as e:
+                failed += 1
+                print(f"[FAIL] {target}: {e}", file=sys.stderr)
+    except RuntimeError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
-    main()
+    argv = sys.argv[1:]
+    profile = "--profile" in argv
+    if profile:
+        argv.remove("--profile")
+
+    run = (lambda: cli(argv)) if argv else main
+    if profile:
+        from perf import run_profiled
+        sys.exit(run_profiled(run))
+    sys.exit(run())
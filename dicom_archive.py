@@ -0,0 +1,209 @@
+import io
+from pathlib import Path
+
+# py7zr / rarfile / pydicom are imported on first use
+
+from archive_extract import extract_archive, plan_members
+from dicom_detect import HEADER_LEN, kind_from_bytes
+from dicom_manifest import ensure_manifest, entry_from_dataset, read_dataset, write_manifest
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# Bytes decompressed per member to read its header. CT headers are a few
+# KB; members whose header runs past this are read whole (second pass).
+HEAD_BYTES = 64 * 1024
+
+PIXEL_DATA_TAG = b"\xe0\x7f\x10\x00"   # (7FE0,0010), little endian
+
+# --------------------------------------------------
+# HEADER INDEX
+# --------------------------------------------------
+
+def _header_complete(head: bytes, size: int) -> bool:
+    """
+    pydicom reads a cut-off header without complaint (the missing tags
+    are just absent), so a prefix only counts if it reaches Pixel Data.
+    """
+    return len(head) >= size or PIXEL_DATA_TAG in head
+
+
+def _member_entry(name, size, data, crc):
+    """
+    Manifest entry from the member's first bytes (complete header), or
+    None if it isn't DICOM. crc = the member's CRC32 from the archive
+    (dedup compares members by it).
+    """
+    kind = kind_from_bytes(data[:HEADER_LEN])
+    if kind is None:
+        return None
+    try:
+        ds = read_dataset(io.BytesIO(data), kind)
+    except Exception:
+        return None
+    entry = entry_from_dataset(ds, name, size)
+    entry["crc"] = crc
+    return entry
+
+
+def _index_members(archive, dicom_dir: Path):
+    """
+    zipfile.ZipFile / rarfile.RarFile: each member is opened and only
+    HEAD_BYTES are decompressed.
+    """
+    infos = [i for i in archive.infolist() if not i.is_dir()]
+    wanted, _ = plan_members(dicom_dir, [(i, i.filename, i.file_size) for i in infos])
+
+    files = []
+    for info, _dst, size in wanted:
+        with archive.open(info) as f:
+            head = f.read(HEAD_BYTES)
+        if kind_from_bytes(head[:HEADER_LEN]) and not _header_complete(head, size):
+            head = archive.read(info)
+        entry = _member_entry(info.filename, size, head, info.CRC)
+        if entry:
+            files.append(entry)
+    return files
+
+
+def _7z_heads(archive, names, limit):
+    """
+    {name: first `limit` bytes} (limit None = whole member). Solid blocks
+    still decompress front to back, but nothing is written to disk.
+    """
+    from py7zr.io import Py7zIO, WriterFactory
+
+    class HeadWriter(Py7zIO):
+        def __init__(self):
+            self.buf = bytearray()
+            self.written = 0
+
+        def write(self, s):
+            room = len(s) if limit is None else limit - len(self.buf)
+            if room > 0:
+                self.buf += s[:room]
+            self.written += len(s)
+            return len(s)
+
+        def read(self, size=None):
+            return b""
+
+        def seek(self, offset, whence=0):
+            return 0
+
+        def flush(self):
+            pass
+
+        def size(self):
+            return self.written
+
+    class HeadWriterFactory(WriterFactory):
+        def __init__(self):
+            self.writers = {}
+
+        def create(self, filename):
+            self.writers[filename] = HeadWriter()
+            return self.writers[filename]
+
+    factory = HeadWriterFactory()
+    archive.reset()
+    archive.extract(targets=list(names), factory=factory)
+    return {name: bytes(w.buf) for name, w in factory.writers.items()}
+
+
+def _index_7z(archive, dicom_dir: Path):
+    infos = [i for i in archive.list() if not i.is_directory]
+    wanted, _ = plan_members(dicom_dir, [(i.filename, i.filename, i.uncompressed) for i in infos])
+    sizes = {name: size for name, _dst, size in wanted}
+    crcs = {i.filename: i.crc32 for i in infos}
+    if not sizes:
+        return []
+
+    heads = _7z_heads(archive, sizes, HEAD_BYTES)
+    files = []
+    long_headers = []
+    for name, head in heads.items():
+        if kind_from_bytes(head[:HEADER_LEN]) and not _header_complete(head, sizes[name]):
+            long_headers.append(name)
+            continue
+        entry = _member_entry(name, sizes[name], head, crcs.get(name))
+        if entry:
+            files.append(entry)
+
+    if long_headers:
+        for name, data in _7z_heads(archive, long_headers, None).items():
+            entry = _member_entry(name, sizes[name], data, crcs.get(name))
+            if entry:
+                files.append(entry)
+    return files
+
+
+def index_archive(archive, dicom_dir) -> list:
+    """
+    Manifest entries for the DICOM members of archive; "path" is the
+    member name, i.e. where extract_archive(archive, dicom_dir) puts it.
+    Junk is skipped and unsafe names raise, as in extraction.
+    """
+    archive = Path(archive)
+    dicom_dir = Path(dicom_dir)
+    ext = archive.suffix.lower()
+
+    if ext == ".zip":
+        import zipfile
+        with zipfile.ZipFile(archive, "r") as z:
+            return _index_members(z, dicom_dir)
+    elif ext == ".7z":
+        import py7zr
+        with py7zr.SevenZipFile(archive, "r") as z:
+            return _index_7z(z, dicom_dir)
+    elif ext == ".rar":
+        import rarfile
+        with rarfile.RarFile(archive, "r") as r:
+            return _index_members(r, dicom_dir)
+    else:
+        raise RuntimeError(f"Unsupported archive format: {ext}")
+
+# --------------------------------------------------
+# ARCHIVE-BACKED CASES
+# --------------------------------------------------
+
+def build_archive_manifest(archive, dicom_dir):
+    """
+    Manifest for a case whose DICOM store is archive (kept inside
+    dicom_dir). Nothing is extracted.
+    """
+    archive = Path(archive)
+    files = index_archive(archive, dicom_dir)
+    return write_manifest(dicom_dir, files, archive=archive.name)
+
+
+def ensure_series_files(dicom_dir, series_uid):
+    """
+    Paths of one series, extracting from the case archive whatever is
+    missing (or was left half-written). Plain cases are returned as is.
+    """
+    dicom_dir = Path(dicom_dir)
+    manifest = ensure_manifest(dicom_dir)
+    entries = [e for e in manifest["files"] if e.get("SeriesInstanceUID") == series_uid]
+
+    missing = set()
+    for e in entries:
+        path = dicom_dir / e["path"]
+        if not path.exists() or path.stat().st_size != e["size"]:
+            missing.add(e["path"])
+
+    if missing and manifest.get("archive"):
+        print(f"Extracting series from {manifest['archive']} ({len(missing)} files)")
+        extract_archive(dicom_dir / manifest["archive"], dicom_dir, only=missing)
+
+    return [dicom_dir / e["path"] for e in entries]
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 3:
+        print("Usage: python dicom_archive.py <archive> <DICOM folder>")
+        sys.exit(1)
+    m = build_archive_manifest(sys.argv[1], sys.argv[2])
+    print(f"{len(m['files'])} files, {len(m['series'])} series (archive: {m['archive']})")
@@ -0,0 +1,225 @@
+import hashlib
+import os
+import time
+import zipfile
+from pathlib import Path
+
+from archive_extract import is_junk
+from case_session import CaseSession
+from dicom_dedup import HASH_CHUNK, prune_empty_dirs
+from dicom_detect import iter_files
+from dicom_manifest import (
+    ARCHIVE_MARKER,
+    MANIFEST_FILENAME,
+    PLACEHOLDER_NAMES,
+    ensure_manifest,
+    mark_archive_backed,
+)
+from perf import span
+from utils import FSYNC_POLICY, save_json
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# The case's DICOM/ is packed into this archive (deflate, lossless: the
+# files come back byte for byte). Opening a series in Slicer extracts just
+# that series again (dicom_archive.ensure_series_files).
+COMPACT_ARCHIVE = "DICOM.zip"
+COMPRESS_LEVEL = 6      # zlib; 9 is ~2x slower for a few % less
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+def _pack(files, dicom_dir: Path, part: Path) -> dict:
+    """
+    Writes files into part, hashing each while copying.
+    Returns {member name: sha256}.
+    """
+    digests = {}
+    with zipfile.ZipFile(part, "w", zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as z:
+        for path in files:
+            name = Path(os.path.relpath(path, dicom_dir)).as_posix()
+            info = zipfile.ZipInfo.from_file(path, name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            h = hashlib.sha256()
+            with open(path, "rb") as src, z.open(info, "w", force_zip64=info.file_size > 2**31) as dst:
+                while chunk := src.read(HASH_CHUNK):
+                    h.update(chunk)
+                    dst.write(chunk)
+            digests[name] = h.hexdigest()
+    return digests
+
+
+def _make_durable(part: Path, archive: Path):
+    """
+    os.replace(part, archive) with the same fsync policy as
+    utils.atomic_write_text: the originals are deleted right after, so
+    the archive must be on disk, not only in the page cache.
+    """
+    if FSYNC_POLICY != "none":
+        with open(part, "r+b") as f:    # Windows only flushes writable handles
+            os.fsync(f.fileno())
+    os.replace(part, archive)
+    if FSYNC_POLICY == "full" and os.name != "nt":
+        dir_fd = os.open(archive.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def verify_archive(archive: Path, digests: dict):
+    """
+    Reads every member back and compares it with the original sha256.
+    Raises RuntimeError on any difference or missing member.
+    """
+    with zipfile.ZipFile(archive, "r") as z:
+        names = set(z.namelist())
+        missing = set(digests) - names
+        if missing:
+            raise RuntimeError(f"Compaction check failed: {len(missing)} files missing from {archive.name}")
+        for name, digest in digests.items():
+            h = hashlib.sha256()
+            with z.open(name) as f:
+                while chunk := f.read(HASH_CHUNK):
+                    h.update(chunk)
+            if h.hexdigest() != digest:
+                raise RuntimeError(f"Compaction check failed: {name} differs in {archive.name}")
+
+
+def _drop_extracted(dicom_dir: Path, archive: Path) -> int:
+    """
+    Already compacted case: deletes the files extracted from the archive
+    (e.g. the series Slicer opened) whose CRC matches their member.
+    Returns the bytes freed.
+    """
+    freed = 0
+    with zipfile.ZipFile(archive, "r") as z:
+        for info in z.infolist():
+            path = dicom_dir / info.filename
+            if info.is_dir() or not path.is_file() or path.stat().st_size != info.file_size:
+                continue
+            crc = 0
+            with open(path, "rb") as f:
+                while chunk := f.read(HASH_CHUNK):
+                    crc = zipfile.crc32(chunk, crc)
+            if crc == info.CRC:
+                os.remove(path)
+                freed += info.file_size
+    return freed
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+def compact_dicom(dicom_dir) -> dict:
+    """
+    Packs every file of dicom_dir (except the manifest, template
+    placeholders and junk) into COMPACT_ARCHIVE, verifies the round
+    trip, points the manifest at the archive and only then deletes the
+    loose files.
+    Returns {"files", "bytes_before", "bytes_after", "seconds"};
+    files is 0 for a case that was already compacted; a case backed by
+    a 7z / rar store is not repacked ("archive" names it).
+    """
+    dicom_dir = Path(dicom_dir)
+    t0 = time.perf_counter()
+    manifest = ensure_manifest(dicom_dir)
+    if not manifest["files"]:
+        raise RuntimeError(f"Nothing to compact in {dicom_dir}")
+
+    archive = dicom_dir / COMPACT_ARCHIVE
+    if manifest.get("archive"):
+        archive = dicom_dir / manifest["archive"]
+        if archive.suffix.lower() != ".zip":
+            # 7z / rar store: read-only here, left as it is
+            size = archive.stat().st_size
+            return {
+                "files": 0,
+                "bytes_before": size,
+                "bytes_after": size,
+                "seconds": 0.0,
+                "archive": archive.name,
+            }
+        freed = _drop_extracted(dicom_dir, archive)
+        prune_empty_dirs(dicom_dir, {p for p in dicom_dir.rglob("*") if p.is_dir()})
+        return {
+            "files": 0,
+            "bytes_before": freed + archive.stat().st_size,
+            "bytes_after": archive.stat().st_size,
+            "seconds": round(time.perf_counter() - t0, 3),
+        }
+
+    if archive.exists():
+        # packed earlier but the manifest was rebuilt: don't overwrite it
+        raise RuntimeError(f"{archive.name} exists but the manifest doesn't use it: {dicom_dir}")
+
+    skip = {dicom_dir / MANIFEST_FILENAME, dicom_dir / ARCHIVE_MARKER, archive}
+    files = sorted(
+        p for p in map(Path, iter_files(dicom_dir))
+        if p not in skip and p.name not in PLACEHOLDER_NAMES
+        and not is_junk(p.relative_to(dicom_dir).as_posix())
+    )
+    before = sum(p.stat().st_size for p in files)
+
+    part = archive.with_name(archive.name + ".part")
+    try:
+        digests = _pack(files, dicom_dir, part)
+        verify_archive(part, digests)
+    except Exception:
+        part.unlink(missing_ok=True)
+        raise
+    _make_durable(part, archive)
+
+    # manifest first: if deleting stops halfway, the case still opens
+    manifest["archive"] = archive.name
+    save_json(dicom_dir / MANIFEST_FILENAME, manifest)
+    mark_archive_backed(dicom_dir, archive.name)
+
+    for p in files:
+        os.remove(p)
+    prune_empty_dirs(dicom_dir, {p.parent for p in files})
+
+    return {
+        "files": len(files),
+        "bytes_before": before,
+        "bytes_after": archive.stat().st_size,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def compact_case(project_dir) -> dict:
+    """
+    compact_dicom on the project's DICOM/ plus a COMPACT log event.
+    """
+    project_dir = Path(project_dir)
+    dicom_dir = project_dir / "DICOM"
+    if not dicom_dir.exists():
+        raise RuntimeError(f"DICOM folder not found: {dicom_dir}")
+
+    with span("compact_dicom") as info:
+        info.update(compact_dicom(dicom_dir))
+
+    before, after = info["bytes_before"] / 1e6, info["bytes_after"] / 1e6
+    if info.get("archive"):
+        print(f"[OK] Archive-backed ({info['archive']}, {after:.1f} MB), not repacked")
+        return info
+    if not info["files"]:
+        # re-run: only extracted series were dropped, nothing new to log
+        print(f"[OK] Already compacted: {before - after:.1f} MB of extracted series removed")
+        return info
+
+    print(f"[OK] DICOM compacted: {before:.1f} MB -> {after:.1f} MB in {info['seconds']:.1f}s")
+    with CaseSession(project_dir) as case:
+        case.event("COMPACT", f"DICOM compacted: {before:.1f} MB -> {after:.1f} MB")
+    return info
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 2:
+        print("Usage: python dicom_compact.py <project_path>")
+        sys.exit(1)
+    compact_case(sys.argv[1])
@@ -0,0 +1,153 @@
+import hashlib
+import os
+from pathlib import Path
+
+from dicom_manifest import MANIFEST_FILENAME, folder_stamp, summarize_series
+from utils import save_json
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+HASH_CHUNK = 1024 * 1024
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+def file_hash(path) -> str:
+    """
+    sha256 of the file, read in chunks.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _canonical_order(entry):
+    # shallowest path wins (the loose copy over DICOMDIR subtrees), then name
+    return entry["path"].count("/"), entry["path"]
+
+
+def _split_by_content(dicom_dir, entries):
+    """
+    Entries -> lists of byte-identical files. Only equal sizes can be
+    duplicates, so only those are compared: archive members by the CRC32
+    the archive stores, loose files by sha256. An entry with neither is
+    never merged.
+    """
+    by_size = {}
+    for e in entries:
+        by_size.setdefault(e["size"], []).append(e)
+
+    out = []
+    for same_size in by_size.values():
+        if len(same_size) == 1:
+            out.append(same_size)
+            continue
+        by_content = {}
+        for e in same_size:
+            path = Path(dicom_dir) / e["path"]
+            if e.get("crc") is not None:
+                key = ("crc", e["crc"])
+            elif path.exists():
+                key = ("sha256", file_hash(path))
+            else:
+                key = ("path", e["path"])
+            by_content.setdefault(key, []).append(e)
+        out.extend(by_content.values())
+    return out
+
+
+def find_duplicates(dicom_dir, files):
+    """
+    Groups manifest entries that are the same instance: same bytes, and
+    the same SOPInstanceUID where they have one. A UID whose copies
+    differ (corrected re-send, PACS reusing UIDs) keeps every version.
+    Returns (kept, dropped, conflicting UIDs).
+    """
+    by_uid = {}
+    no_uid = []
+    for e in files:
+        uid = e.get("SOPInstanceUID")
+        if uid:
+            by_uid.setdefault(uid, []).append(e)
+        else:
+            no_uid.append(e)
+
+    groups = _split_by_content(dicom_dir, no_uid)
+    conflicts = []
+    for uid, entries in by_uid.items():
+        parts = _split_by_content(dicom_dir, entries) if len(entries) > 1 else [entries]
+        if len(parts) > 1:
+            conflicts.append(uid)
+        groups.extend(parts)
+
+    kept, dropped = [], []
+    for entries in groups:
+        entries.sort(key=_canonical_order)
+        kept.append(entries[0])
+        dropped.extend(entries[1:])
+    return kept, dropped, conflicts
+
+
+def prune_empty_dirs(root: Path, dirs):
+    """
+    Removes dirs (and emptied parents) left empty, never root itself.
+    """
+    for d in sorted(dirs, key=lambda p: len(p.parts), reverse=True):
+        while d != root and root in d.parents:
+            try:
+                d.rmdir()
+            except OSError:
+                break   # not empty
+            d = d.parent
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+def dedup_dicom(dicom_dir, manifest) -> dict:
+    """
+    Deletes duplicate instances from dicom_dir, keeping one canonical
+    copy each, and rewrites the manifest without them (in place).
+    Returns {"duplicates": n, "bytes_saved": n, "uid_conflicts": n}.
+    """
+    dicom_dir = Path(dicom_dir)
+    kept, dropped, conflicts = find_duplicates(dicom_dir, manifest["files"])
+    if conflicts:
+        print(f"[WARN] {len(conflicts)} SOPInstanceUIDs have copies with different content, "
+              f"all kept (e.g. {conflicts[0]})")
+    if not dropped:
+        return {"duplicates": 0, "bytes_saved": 0, "uid_conflicts": len(conflicts)}
+
+    saved = 0
+    for e in dropped:
+        path = dicom_dir / e["path"]
+        try:
+            saved += path.stat().st_size
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    prune_empty_dirs(dicom_dir, {(dicom_dir / e["path"]).parent for e in dropped})
+
+    dropped_paths = {e["path"] for e in dropped}
+    manifest["files"] = [e for e in manifest["files"] if e["path"] not in dropped_paths]
+    manifest["series"] = summarize_series(manifest["files"])
+    if "stamp" in manifest:
+        manifest["stamp"] = folder_stamp(dicom_dir)
+    save_json(dicom_dir / MANIFEST_FILENAME, manifest)
+
+    return {"duplicates": len(dropped), "bytes_saved": saved, "uid_conflicts": len(conflicts)}
+
+
+if __name__ == "__main__":
+    import sys
+    from dicom_manifest import ensure_manifest
+    if len(sys.argv) != 2:
+        print("Usage: python dicom_dedup.py <DICOM folder>")
+        sys.exit(1)
+    result = dedup_dicom(sys.argv[1], ensure_manifest(sys.argv[1]))
+    print(f"{result['duplicates']} duplicates removed, {result['bytes_saved'] / 1e6:.1f} MB saved")
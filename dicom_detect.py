@@ -0,0 +1,153 @@
+import os
+import struct
+from pathlib import Path
+
+from scanner import stream_map
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+PREAMBLE_LEN = 128
+MAGIC = b"DICM"
+HEADER_LEN = PREAMBLE_LEN + len(MAGIC)  # the only bytes ever read per file
+
+DETECT_WORKERS = 8  # reads are tiny; threads overlap the open() round trips
+
+# Explicit VR codes; OB/OW/... carry a 4-byte length after 2 reserved bytes
+VRS = {
+    b"AE", b"AS", b"AT", b"CS", b"DA", b"DS", b"DT", b"FL", b"FD", b"IS",
+    b"LO", b"LT", b"OB", b"OD", b"OF", b"OL", b"OV", b"OW", b"PN", b"SH",
+    b"SL", b"SQ", b"SS", b"ST", b"SV", b"TM", b"UC", b"UI", b"UL", b"UN",
+    b"UR", b"US", b"UT", b"UV",
+}
+LONG_VRS = {b"OB", b"OD", b"OF", b"OL", b"OV", b"OW", b"SQ", b"UC", b"UN", b"UR", b"UT", b"UV"}
+
+# Files without preamble start straight with the dataset, at the file meta
+# (0002,xxxx) or the identifying group (0008,xxxx)
+FIRST_GROUPS = (0x0002, 0x0008)
+
+_TAG = struct.Struct("<HH")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+# --------------------------------------------------
+# CLASSIFIER
+# --------------------------------------------------
+
+def _element_end(head: bytes, pos: int):
+    """
+    Offset after the element starting at pos (little endian, explicit or
+    implicit VR), or None if it doesn't fit in head.
+    """
+    vr = head[pos + 4:pos + 6]
+    if vr in LONG_VRS:
+        if pos + 12 > len(head):
+            return None
+        return pos + 12 + _U32.unpack_from(head, pos + 8)[0]
+    if vr in VRS:
+        return pos + 8 + _U16.unpack_from(head, pos + 6)[0]
+    return pos + 8 + _U32.unpack_from(head, pos + 4)[0]
+
+
+def _looks_like_raw_dataset(head: bytes) -> bool:
+    """
+    No preamble (old implicit-VR exports): the first element must be in
+    a leading group and the next tag must follow it in ascending order.
+    Text files fail on the first tag ('RE' of README = group 0x4552).
+    """
+    if len(head) < 12:
+        return False
+    group, elem = _TAG.unpack_from(head, 0)
+    if group not in FIRST_GROUPS:
+        return False
+
+    nxt = _element_end(head, 0)
+    if nxt is None or nxt + 4 > len(head):
+        return False
+    group2, elem2 = _TAG.unpack_from(head, nxt)
+    return (group2, elem2) > (group, elem) and group2 <= 0x0010
+
+
+def kind_from_bytes(head: bytes):
+    """
+    head = the first HEADER_LEN bytes of a file. Returns "part10"
+    (preamble + DICM), "raw" (dataset without preamble; pydicom needs
+    force=True for those) or None.
+    """
+    if head[PREAMBLE_LEN:HEADER_LEN] == MAGIC:
+        return "part10"
+    if _looks_like_raw_dataset(head):
+        return "raw"
+    return None
+
+
+def dicom_kind(path):
+    """
+    kind_from_bytes() for a file; None if unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            return kind_from_bytes(f.read(HEADER_LEN))
+    except OSError:
+        return None
+
+
+def is_dicom_file(path) -> bool:
+    return dicom_kind(path) is not None
+
+# --------------------------------------------------
+# TREES
+# --------------------------------------------------
+
+def iter_files(folder):
+    """
+    Yields file paths under folder (os.scandir, depth first).
+    """
+    stack = [str(folder)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+
+def _classify(path):
+    return path, is_dicom_file(path)
+
+
+def classify_tree(folder, workers=DETECT_WORKERS) -> dict:
+    """
+    {path: is_dicom} for every file under folder, read in parallel.
+    """
+    return dict(stream_map(_classify, iter_files(folder), workers))
+
+
+def first_dicom(folder, workers=DETECT_WORKERS) -> Path | None:
+    """
+    First confirmed DICOM file under folder, or None. Stops reading as
+    soon as one is found (only the in-flight reads finish).
+    """
+    results = stream_map(_classify, iter_files(folder), workers)
+    try:
+        for path, ok in results:
+            if ok:
+                return Path(path)
+    finally:
+        results.close()
+    return None
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 2:
+        print("Usage: python dicom_detect.py <folder>")
+        sys.exit(1)
+    found = classify_tree(sys.argv[1])
+    n = sum(found.values())
+    print(f"{n} DICOM / {len(found) - n} other")
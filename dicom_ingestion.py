@@ -1,22 +1,27 @@
+import contextlib
+import io
+import os
 import shutil
+import time
 from pathlib import Path
-import zipfile
 from datetime import datetime
 
-# optional deps
-import py7zr
-import rarfile
-import pydicom
+# optional deps (py7zr, rarfile, pydicom) are imported on first use
 
-from utils import load_json, save_json
+from archive_extract import extract_archive, is_junk
+from case_session import CaseSession
+from dicom_archive import build_archive_manifest
+from dicom_dedup import dedup_dicom
+from dicom_detect import first_dicom
+from dicom_manifest import PLACEHOLDER_NAMES, build_manifest, load_manifest, patient_name
+from dicom_staging import find_staged, take_staged
+from perf import span
 
 # --------------------------------------------------
 # CONFIG
 # --------------------------------------------------
 
 DICOM_DIRNAME = "DICOM"
-LOG_FILENAME = "Log.txt"
-PEEK_CASE_FILENAME = "peekCase.json"
 
 DOWNLOADS_DIR = Path.home() / "Downloads"
 ARCHIVE_EXTS = (".zip", ".7z", ".rar")
@@ -24,6 +29,10 @@ SINGLE_DICOM_EXTS = (".dcm",)
 
 MAX_LIST = 10
 
+# keep zip / 7z / rar inputs as the case's DICOM store and extract series
+# on demand (dicom_archive.ensure_series_files) instead of unpacking all
+LAZY_ARCHIVES = os.environ.get("DATSYS_LAZY_ARCHIVES") == "1"
+
 
 # --------------------------------------------------
 # HELPERS
@@ -33,27 +42,25 @@ def confirm(msg: str) -> bool:
     return input(f"{msg} [y/N]: ").strip().lower() == "y"
 
 
-def extract_archive(archive: Path, target_dir: Path):
-    ext = archive.suffix.lower()
+def _ignore_junk(_folder, names):
+    # shutil.copytree ignore hook: same junk rules as archive extraction
+    return [n for n in names if is_junk(n)]
 
-    if ext == ".zip":
-        with zipfile.ZipFile(archive, "r") as z:
-            z.extractall(target_dir)
-    elif ext == ".7z":
-        with py7zr.SevenZipFile(archive, "r") as z:
-            z.extractall(target_dir)
-    elif ext == ".rar":
-        with rarfile.RarFile(archive, "r") as r:
-            r.extractall(target_dir)
-    else:
-        raise RuntimeError(f"Unsupported archive format: {ext}")
+
+def has_dicom_data(dicom_dir: Path) -> bool:
+    """
+    False for a missing DICOM/ or one holding only template placeholders.
+    """
+    try:
+        with os.scandir(dicom_dir) as it:
+            return any(e.name not in PLACEHOLDER_NAMES for e in it)
+    except FileNotFoundError:
+        return False
 
 
 def contains_dicom(folder: Path) -> bool:
-    for p in folder.rglob("*"):
-        if p.is_file() and (p.suffix.lower() == ".dcm" or p.suffix == ""):
-            return True
-    return False
+    # content check (DICM magic / raw dataset), not file names
+    return first_dicom(folder) is not None
 
 
 def list_recent_inputs():
@@ -79,7 +86,8 @@ def select_input_interactive() -> Path | None:
     print("\nRecent inputs:")
     for i, p in enumerate(items, 1):
         mtime = datetime.fromtimestamp(p.stat().st_mtime)
-        print(f"[{i}] {p.name}  ({mtime:%Y-%m-%d %H:%M})")
+        ready = "  [staged]" if find_staged(p) else ""
+        print(f"[{i}] {p.name}  ({mtime:%Y-%m-%d %H:%M}){ready}")
 
     print("\nSelect [1-{}] or paste full path".format(len(items)))
     print("Press ENTER to cancel")
@@ -101,73 +109,110 @@ def select_input_interactive() -> Path | None:
     return path
 
 
-def append_log(project_dir: Path, message: str):
-    log_path = project_dir / LOG_FILENAME
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {message}\n")
-
-
 def extract_patient_name(dicom_dir: Path) -> str:
-    for p in dicom_dir.rglob("*"):
-        if not p.is_file():
-            continue
-        try:
-            ds = pydicom.dcmread(p, stop_before_pixels=True)
-            name = ds.get("PatientName", "")
-            if name:
-                return str(name)
-        except Exception:
-            pass
-    return ""
-
-
-def update_peek_case_patient(project_dir: Path, patient_name: str):
-    if not patient_name:
-        return
-
-    peek_path = project_dir / PEEK_CASE_FILENAME
-    if not peek_path.exists():
-        return
-
-    data = load_json(peek_path, {})
-    if not data.get("nombre_paciente"):
-        data["nombre_paciente"] = patient_name
-        save_json(peek_path, data)
+    # from DICOM/manifest.json (built on first use for older cases)
+    return patient_name(dicom_dir)
 
 
 # --------------------------------------------------
 # MAIN INGESTION
 # --------------------------------------------------
 
-def ingest_dicom(project_path: str):
+def ingest_dicom(project_path: str, source=None, replace=None, lazy=None, workers=None,
+                 compact=False):
+    """
+    source / replace left as None are asked interactively.
+    Scripted callers pass both and never hit a prompt.
+    lazy=None follows LAZY_ARCHIVES; workers goes to extract_archive.
+    compact=True packs DICOM/ afterwards (dicom_compact).
+    Returns the ingest stats, or None if aborted at a prompt.
+    """
     project_dir = Path(project_path)
     if not project_dir.exists():
         raise RuntimeError(f"Project path does not exist: {project_dir}")
 
-    dicom_dir = project_dir / DICOM_DIRNAME
+    if source is not None:
+        source = Path(source)
+        if not source.exists():
+            raise RuntimeError(f"Path not found: {source}")
 
-    if dicom_dir.exists():
-        if not confirm("DICOM folder already exists. Replace it?"):
-            print("Aborted.")
-            return
-        shutil.rmtree(dicom_dir)
+    dicom_dir = project_dir / DICOM_DIRNAME
 
-    dicom_dir.mkdir()
+    # all questions first, so the timed part below is only the work
+    if has_dicom_data(dicom_dir):
+        if replace is None:
+            if not confirm("DICOM folder already exists. Replace it?"):
+                print("Aborted.")
+                return
+        elif not replace:
+            raise RuntimeError(f"DICOM folder already exists (use --replace): {dicom_dir}")
 
-    source = select_input_interactive()
+    if source is None:
+        source = select_input_interactive()
     if source is None:
         print("Aborted.")
         return
 
     print(f"\nUsing input: {source}")
 
+    with span("ingest_dicom", source=source.name) as info:
+        info.update(_ingest(project_dir, dicom_dir, source, LAZY_ARCHIVES if lazy is None else lazy, workers))
+
+    print(f"[OK] DICOM ingested into: {dicom_dir}")
+
+    if compact:
+        from dicom_compact import compact_case
+        info["compact"] = compact_case(project_dir)
+    return info
+
+
+def _ingest(project_dir: Path, dicom_dir: Path, source: Path, lazy=False, workers=None) -> dict:
+    """
+    Returns extraction stats (empty for folder / single-file inputs)
+    plus dedup results and the DICOM file, byte and series counts.
+    """
+    stats = {}
+    manifest = None
+    staged_meta = None
+    if dicom_dir.exists():
+        shutil.rmtree(dicom_dir)
+    dicom_dir.mkdir()
+
+    staged = None if lazy else find_staged(source)
+
     # ---- HANDLE INPUT TYPES ----
-    if source.is_dir():
-        shutil.copytree(source, dicom_dir, dirs_exist_ok=True)
+    if staged:
+        # pre-extracted by the inbox watcher (dicom_staging): just a move
+        dicom_dir.rmdir()
+        try:
+            staged_meta = take_staged(staged, dicom_dir)
+        except Exception:
+            # cross-volume move stopped halfway: the staged copy is intact
+            shutil.rmtree(dicom_dir, ignore_errors=True)
+            raise
+        manifest = load_manifest(dicom_dir)
+        stats["staged_at"] = staged_meta.get("staged_at")
+
+    elif source.is_dir():
+        shutil.copytree(source, dicom_dir, dirs_exist_ok=True, ignore=_ignore_junk)
+
+    elif source.suffix.lower() in ARCHIVE_EXTS and lazy:
+        # only the headers are read; the archive stays the store
+        try:
+            shutil.copy2(source, dicom_dir / source.name)
+            manifest = build_archive_manifest(dicom_dir / source.name, dicom_dir)
+        except Exception:
+            shutil.rmtree(dicom_dir)
+            raise
+        stats["archive"] = source.name
 
     elif source.suffix.lower() in ARCHIVE_EXTS:
-        extract_archive(source, dicom_dir)
+        try:
+            stats = extract_archive(source, dicom_dir, workers=workers)
+        except Exception:
+            # unsafe path / corrupt archive: don't leave half a DICOM folder
+            shutil.rmtree(dicom_dir)
+            raise
 
     elif source.suffix.lower() in SINGLE_DICOM_EXTS:
         shutil.copy2(source, dicom_dir / source.name)
@@ -176,15 +221,114 @@ def ingest_dicom(project_path: str):
         shutil.rmtree(dicom_dir)
         raise RuntimeError("Unsupported DICOM input")
 
-    if not contains_dicom(dicom_dir):
+    # every header is read here, once; later consumers use the manifest
+    if manifest is None:
+        manifest = build_manifest(dicom_dir)
+    if not manifest["files"]:
         shutil.rmtree(dicom_dir)
         raise RuntimeError("Input does not appear to contain DICOM files")
 
-    patient_name = extract_patient_name(dicom_dir)
-    update_peek_case_patient(project_dir, patient_name)
+    # same study sent twice (DICOMDIR copy + loose files): keep one copy
+    dedup = dedup_dicom(dicom_dir, manifest)
+    if staged_meta:
+        # the watcher already dropped its duplicates; count them too
+        # (UID conflicts are all still here and were found again)
+        for k in ("duplicates", "bytes_saved"):
+            dedup[k] += staged_meta.get(k, 0)
+    stats.update(dedup)
+    stats["dicom_files"] = len(manifest["files"])
+    stats["dicom_bytes"] = sum(f["size"] for f in manifest["files"])
+    stats["series"] = len(manifest["series"])
+
+    with CaseSession(project_dir) as case:
+        if case.exists:
+            case.set_if_empty("nombre_paciente", manifest["patient"]["PatientName"])
+        case.event("INGEST", f'DICOM ingested from "{source.name}"')
+        if dedup["duplicates"]:
+            case.event(
+                "DEDUP",
+                f'{dedup["duplicates"]} duplicate DICOM files removed '
+                f'({dedup["bytes_saved"] / 1e6:.1f} MB)',
+            )
+        if dedup["uid_conflicts"]:
+            case.event(
+                "DEDUP",
+                f'{dedup["uid_conflicts"]} SOPInstanceUIDs with differing copies, all kept',
+            )
+
+    if dedup["duplicates"]:
+        print(f'[OK] {dedup["duplicates"]} duplicates removed ({dedup["bytes_saved"] / 1e6:.1f} MB)')
+
+    return stats
 
-    append_log(project_dir, f'DICOM ingested from "{source.name}"')
-    print(f"[OK] DICOM ingested into: {dicom_dir}")
+
+# --------------------------------------------------
+# BATCH
+# --------------------------------------------------
+
+BATCH_MAX_WORKERS = 4   # several extractions at once saturate the share / disk
+
+
+def _batch_job(project_dir, source, replace, lazy, compact):
+    """
+    Pool worker: one non-interactive ingest. Its output is swallowed, so
+    parallel jobs don't interleave lines on the terminal.
+    """
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        # one extraction process per job: the batch pool is the parallelism
+        stats = ingest_dicom(project_dir, source=source, replace=replace, lazy=lazy, workers=1,
+                             compact=compact)
+    return stats, time.perf_counter() - t0
+
+
+def ingest_batch(jobs, replace=False, lazy=None, workers=None, compact=False):
+    """
+    jobs: [(project_id, project_dir, source)]. Runs them on a process pool
+    (extraction, manifest, dedup per project); a failing job doesn't stop
+    the others. Prints one line per finished job and a summary table.
+    Returns [{"project", "source", "status", "seconds", ...stats}].
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    workers = workers or min(BATCH_MAX_WORKERS, os.cpu_count() or 1, len(jobs))
+    print(f"Ingesting {len(jobs)} projects on {workers} workers")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_batch_job, str(project_dir), str(source), replace, lazy, compact): (project_id, source)
+            for project_id, project_dir, source in jobs
+        }
+        for done, fut in enumerate(as_completed(futures), 1):
+            project_id, source = futures[fut]
+            result = {"project": project_id, "source": Path(source).name}
+            try:
+                stats, seconds = fut.result()
+            except Exception as e:
+                result.update(status="failed", error=str(e))
+                print(f"[{done}/{len(jobs)}] [FAIL] {project_id}: {e}")
+            else:
+                result.update(stats, status="ok", seconds=round(seconds, 1))
+                print(f"[{done}/{len(jobs)}] [{result['status'].upper()}] {project_id} "
+                      f"{result.get('dicom_files', 0)} files, {result.get('seconds', 0)}s")
+            results.append(result)
+
+    print_batch_report(results)
+    return results
+
+
+def print_batch_report(results):
+    print(f"\n{'project':<18} {'status':<8} {'files':>6} {'series':>6} {'MB':>8} {'s':>7}  source")
+    print("-" * 72)
+    for r in sorted(results, key=lambda r: r["project"]):
+        print(
+            f"{r['project']:<18} {r['status']:<8} {r.get('dicom_files', 0):>6} "
+            f"{r.get('series', 0):>6} {r.get('dicom_bytes', 0) / 1e6:>8.1f} {r.get('seconds', 0):>7.1f}  "
+            f"{r['source']}" + (f"  ({r['error']})" if r.get("error") else "")
+        )
+    ok = sum(r["status"] == "ok" for r in results)
+    print(f"\n{ok}/{len(results)} ingested")
 
 
 # --------------------------------------------------
@@ -194,6 +338,6 @@ def ingest_dicom(project_path: str):
 if __name__ == "__main__":
     import sys
     if len(sys.argv) < 2:
-        print("Usage: python dicom_ingestion.py <project_path>")
+        print("Usage: python dicom_ingestion.py <project_path> [source]")
         sys.exit(1)
-    ingest_dicom(sys.argv[1])
+    ingest_dicom(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
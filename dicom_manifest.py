@@ -0,0 +1,275 @@
+import os
+from pathlib import Path
+
+# pydicom is imported on first use
+
+from dicom_detect import dicom_kind, first_dicom, iter_files
+from scanner import stream_map
+from utils import atomic_write_text, load_json, save_json, now_iso
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+MANIFEST_WORKERS = 8    # header reads overlap well on the share; parsing holds the GIL
+
+# archive-backed cases keep their store inside DICOM/ (lazy ingest, compaction)
+STORE_ARCHIVE_EXTS = (".zip", ".7z", ".rar")
+# names that archive; survives a lost / outdated manifest.json
+ARCHIVE_MARKER = ".archive"
+# files the project template puts in an empty DICOM/ folder
+PLACEHOLDER_NAMES = {".gitkeep"}
+
+# The only tags read from each file (with stop_before_pixels)
+HEADER_TAGS = (
+    "PatientName",
+    "PatientID",
+    "PatientBirthDate",
+    "PatientSex",
+    "StudyInstanceUID",
+    "StudyDate",
+    "StudyDescription",
+    "SeriesInstanceUID",
+    "SeriesNumber",
+    "SeriesDescription",
+    "Modality",
+    "SOPInstanceUID",
+    "SOPClassUID",
+    "InstanceNumber",
+    "ImagePositionPatient",
+    "ImageOrientationPatient",
+    "SliceThickness",
+    "PixelSpacing",
+    "Rows",
+    "Columns",
+    "ConvolutionKernel",
+    "ImageType",
+)
+
+PATIENT_FIELDS = ("PatientName", "PatientID", "PatientBirthDate", "PatientSex")
+
+# --------------------------------------------------
+# HEADER READ
+# --------------------------------------------------
+
+def _plain(value):
+    """
+    pydicom values -> JSON types.
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (list, tuple)) or type(value).__name__ == "MultiValue":
+        return [_plain(v) for v in value]
+    for cast in (int, float):
+        if isinstance(value, cast):
+            return cast(value)
+    return str(value)
+
+
+def read_dataset(fp, kind):
+    """
+    Header only (HEADER_TAGS) from a path or binary file object.
+    """
+    import pydicom
+    return pydicom.dcmread(
+        fp,
+        stop_before_pixels=True,
+        specific_tags=list(HEADER_TAGS),
+        force=kind == "raw",
+    )
+
+
+def entry_from_dataset(ds, rel_path: str, size: int) -> dict:
+    entry = {"path": rel_path, "size": size}
+    for tag in HEADER_TAGS:
+        entry[tag] = _plain(ds.get(tag))
+    return entry
+
+
+def read_header(path, root):
+    """
+    One file -> manifest entry, or None if it isn't DICOM.
+    """
+    kind = dicom_kind(path)
+    if kind is None:
+        return None
+    try:
+        ds = read_dataset(path, kind)
+    except Exception:
+        return None
+
+    rel_path = Path(os.path.relpath(path, root)).as_posix()
+    return entry_from_dataset(ds, rel_path, os.stat(path).st_size)
+
+# --------------------------------------------------
+# BUILD / LOAD
+# --------------------------------------------------
+
+def summarize_series(files):
+    """
+    {SeriesInstanceUID: {description, modality, count, ...}} from entries.
+    """
+    series = {}
+    for f in files:
+        uid = f.get("SeriesInstanceUID") or ""
+        s = series.setdefault(uid, {
+            "SeriesNumber": f.get("SeriesNumber"),
+            "SeriesDescription": f.get("SeriesDescription") or "",
+            "Modality": f.get("Modality") or "",
+            "StudyInstanceUID": f.get("StudyInstanceUID") or "",
+            "ConvolutionKernel": f.get("ConvolutionKernel"),
+            "SliceThickness": f.get("SliceThickness"),
+            "ImageType": f.get("ImageType"),
+            "count": 0,
+        })
+        s["count"] += 1
+    return series
+
+
+def folder_stamp(dicom_dir) -> list:
+    """
+    [file count, newest mtime_ns] of dicom_dir, manifest excluded.
+    Files copied in (or removed) by hand change it.
+    """
+    manifest_path = os.path.join(str(dicom_dir), MANIFEST_FILENAME)
+    count = newest = 0
+    stack = [str(dicom_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and entry.path != manifest_path:
+                        count += 1
+                        newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return [count, newest]
+
+
+def build_manifest(dicom_dir, workers=MANIFEST_WORKERS):
+    """
+    Reads every file's header once (thread pool) and writes
+    DICOM/manifest.json. Non-DICOM files are left out.
+    Returns the manifest.
+    """
+    dicom_dir = Path(dicom_dir)
+    manifest_path = dicom_dir / MANIFEST_FILENAME
+    # stamped before reading: files landing meanwhile force a rebuild
+    stamp = folder_stamp(dicom_dir)
+    paths = (p for p in iter_files(dicom_dir) if Path(p) != manifest_path)
+
+    files = [e for e in stream_map(lambda p: read_header(p, dicom_dir), paths, workers) if e]
+    return write_manifest(dicom_dir, files, stamp=stamp)
+
+
+def write_manifest(dicom_dir, files, **extra):
+    """
+    Sorts the entries, adds patient / series summaries and saves.
+    extra = top-level keys (e.g. "archive" for archive-backed cases).
+    A manifest without files is returned but not saved.
+    """
+    files.sort(key=lambda f: (f.get("SeriesInstanceUID") or "", f.get("InstanceNumber") or 0, f["path"]))
+
+    patient = {}
+    for field in PATIENT_FIELDS:
+        patient[field] = next((f[field] for f in files if f.get(field)), "")
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": now_iso(),
+        "patient": patient,
+        "series": summarize_series(files),
+        "files": files,
+        **extra,
+    }
+    if files:
+        save_json(Path(dicom_dir) / MANIFEST_FILENAME, manifest)
+        if extra.get("archive"):
+            mark_archive_backed(dicom_dir, extra["archive"])
+    return manifest
+
+
+def mark_archive_backed(dicom_dir, archive_name):
+    atomic_write_text(Path(dicom_dir) / ARCHIVE_MARKER, archive_name + "\n")
+
+
+def load_manifest(dicom_dir):
+    """
+    The manifest, or None if missing / from another format version.
+    """
+    manifest = load_json(Path(dicom_dir) / MANIFEST_FILENAME, None)
+    if not manifest or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _store_archive(dicom_dir):
+    """
+    Path of the archive a case is backed by, or None: the one named by
+    ARCHIVE_MARKER, else the largest archive at the top of a folder with
+    no loose DICOM files (cases from before the marker). A plain case
+    that also holds a viewer / export zip is not archive-backed.
+    """
+    dicom_dir = Path(dicom_dir)
+    try:
+        name = (dicom_dir / ARCHIVE_MARKER).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        name = ""
+    if name and (dicom_dir / name).is_file():
+        return dicom_dir / name
+
+    try:
+        with os.scandir(dicom_dir) as it:
+            found = [e for e in it if e.is_file() and e.name.lower().endswith(STORE_ARCHIVE_EXTS)]
+    except FileNotFoundError:
+        return None
+    if not found or first_dicom(dicom_dir) is not None:
+        return None
+    return Path(max(found, key=lambda e: e.stat().st_size).path)
+
+
+def ensure_manifest(dicom_dir):
+    """
+    Cases ingested before manifests existed get one on first use, and
+    it is rebuilt when the folder no longer matches its stamp.
+    Archive-backed manifests are kept as is (extracted series come and
+    go); when the manifest is lost, those cases are indexed from their
+    archive again (_store_archive).
+    """
+    manifest = load_manifest(dicom_dir)
+    if manifest and (manifest.get("archive") or manifest.get("stamp") == folder_stamp(dicom_dir)):
+        return manifest
+
+    archive = _store_archive(dicom_dir) if manifest is None else None
+    if archive:
+        from dicom_archive import build_archive_manifest     # imports this module
+        return build_archive_manifest(archive, dicom_dir)
+    return build_manifest(dicom_dir)
+
+
+def patient_name(dicom_dir) -> str:
+    if not Path(dicom_dir).exists():
+        return ""
+    return ensure_manifest(dicom_dir)["patient"].get("PatientName", "")
+
+
+def series_files(manifest, series_uid):
+    """
+    Relative paths of one series, in InstanceNumber order.
+    """
+    return [f["path"] for f in manifest["files"] if f.get("SeriesInstanceUID") == series_uid]
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 2:
+        print("Usage: python dicom_manifest.py <DICOM folder>")
+        sys.exit(1)
+    m = build_manifest(sys.argv[1])
+    print(f"{len(m['files'])} files, {len(m['series'])} series, patient {m['patient']['PatientName']!r}")
+    for uid, s in m["series"].items():
+        print(f"  {s['SeriesNumber']!s:>4} {s['Modality']:<3} {s['count']:>5}  {s['SeriesDescription']}")
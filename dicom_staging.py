@@ -0,0 +1,270 @@
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+from archive_extract import extract_archive
+from dicom_dedup import dedup_dicom
+from dicom_manifest import build_manifest
+from perf import span
+from utils import CLIENTS_DIR, load_json, now_iso, save_json
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# Archives dropped here are pre-extracted and indexed in the background;
+# ingest then only has to move the staged DICOM folder into the project.
+INBOX_DIR = Path(os.environ.get("DATSYS_INBOX") or Path.home() / "Downloads")
+# On the clients share, so take_staged is a rename into the project and
+# not a copy of the whole study across volumes. A DATSYS_STAGING_DIR on
+# another volume works, but ingest then copies.
+STAGING_DIR = Path(os.environ.get("DATSYS_STAGING_DIR") or Path(CLIENTS_DIR) / ".staging")
+STAGE_EXTS = (".zip", ".7z", ".rar")
+
+STAGED_FILENAME = "staged.json"
+FAILED_SUFFIX = ".failed.json"
+PART_SUFFIX = ".part"
+
+POLL_INTERVAL = 2.0     # seconds between inbox listings
+STABLE_SECONDS = 5.0    # size / mtime unchanged this long = download finished
+
+# Only archives downloaded while watching (or this shortly before it
+# started) are staged, not the whole download history.
+BACKLOG_SECONDS = 3600.0
+
+# Staged studies nobody ingested are evicted past this age, then oldest
+# first until the staging folder fits in STAGING_MAX_BYTES.
+STAGING_MAX_AGE = 7 * 24 * 3600.0
+STAGING_MAX_BYTES = 20 * 1024**3
+
+# --------------------------------------------------
+# STAGING
+# --------------------------------------------------
+
+def stage_id(source: Path, st=None) -> str:
+    """
+    Name of the staging folder for one download: file name plus size and
+    mtime, so a re-download of the same name is staged again.
+    """
+    st = st or source.stat()
+    stem = re.sub(r"[^A-Za-z0-9._-]", "_", source.stem)
+    return f"{stem}-{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+def find_staged(source) -> Path | None:
+    """
+    The completed staging folder for this exact source file, or None.
+    """
+    source = Path(source)
+    if not source.is_file() or source.suffix.lower() not in STAGE_EXTS:
+        return None
+    staged = STAGING_DIR / stage_id(source)
+    return staged if (staged / STAGED_FILENAME).exists() else None
+
+
+def stage_input(source) -> Path:
+    """
+    Extracts, indexes (manifest) and dedups source into
+    STAGING_DIR/<stage_id>/DICOM. Built under a .part name and renamed
+    when complete, so a half-staged study is never picked up.
+    Failures are recorded in <stage_id>.failed.json and not retried.
+    """
+    source = Path(source)
+    st = source.stat()
+    sid = stage_id(source, st)
+    final = STAGING_DIR / sid
+    if (final / STAGED_FILENAME).exists():
+        return final
+
+    work = STAGING_DIR / (sid + PART_SUFFIX)
+    if work.exists():
+        shutil.rmtree(work)
+    dicom_dir = work / "DICOM"
+    dicom_dir.mkdir(parents=True)
+
+    try:
+        with span("stage_input", source=source.name) as info:
+            info.update(extract_archive(source, dicom_dir, show_progress=False))
+            manifest = build_manifest(dicom_dir)
+            if not manifest["files"]:
+                raise RuntimeError("Input does not appear to contain DICOM files")
+            dedup = dedup_dicom(dicom_dir, manifest)
+            info.update(dedup)
+    except Exception as e:
+        shutil.rmtree(work, ignore_errors=True)
+        save_json(STAGING_DIR / (sid + FAILED_SUFFIX), {
+            "source": str(source),
+            "failed_at": now_iso(),
+            "error": str(e),
+        })
+        raise
+
+    save_json(work / STAGED_FILENAME, {
+        "source": str(source),
+        "source_name": source.name,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "staged_at": now_iso(),
+        "patient": manifest["patient"]["PatientName"],
+        "files": len(manifest["files"]),
+        "series": len(manifest["series"]),
+        **dedup,
+    })
+    if final.exists():
+        shutil.rmtree(final)
+    os.replace(work, final)
+    return final
+
+
+def take_staged(staged: Path, dicom_dir: Path) -> dict:
+    """
+    Moves a staged DICOM folder to dicom_dir (must not exist) and drops
+    the staging folder. A rename when both are on the same volume
+    (the default STAGING_DIR is), a copy otherwise.
+    Returns the staging record.
+    """
+    meta = load_json(staged / STAGED_FILENAME, {})
+    shutil.move(str(staged / "DICOM"), str(dicom_dir))
+    shutil.rmtree(staged, ignore_errors=True)
+    return meta
+
+# --------------------------------------------------
+# EVICTION
+# --------------------------------------------------
+
+def _tree_bytes(path: Path) -> int:
+    total = 0
+    for dirpath, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(dirpath, name)).st_size
+            except FileNotFoundError:
+                pass
+    return total
+
+
+def prune_staging(max_age=STAGING_MAX_AGE, max_bytes=STAGING_MAX_BYTES) -> int:
+    """
+    Deletes staged studies (and failure records) older than max_age, then
+    the oldest staged studies until the rest fits in max_bytes.
+    Returns how many entries were removed.
+    """
+    try:
+        entries = [(e.stat().st_mtime, Path(e.path)) for e in os.scandir(STAGING_DIR)]
+    except FileNotFoundError:
+        return 0
+
+    def drop(path):
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+    cutoff = time.time() - max_age
+    removed = 0
+    kept = []
+    for mtime, path in entries:
+        if mtime < cutoff:
+            drop(path)
+            removed += 1
+        elif path.is_dir() and not path.name.endswith(PART_SUFFIX):
+            kept.append((mtime, path, _tree_bytes(path)))
+
+    total = sum(size for _m, _p, size in kept)
+    for _mtime, path, size in sorted(kept):
+        if total <= max_bytes:
+            break
+        drop(path)
+        total -= size
+        removed += 1
+    return removed
+
+# --------------------------------------------------
+# WATCHER
+# --------------------------------------------------
+
+def _is_handled(source: Path, st) -> bool:
+    sid = stage_id(source, st)
+    return (
+        (STAGING_DIR / sid / STAGED_FILENAME).exists()
+        or (STAGING_DIR / (sid + FAILED_SUFFIX)).exists()
+    )
+
+
+def _inbox_archives(inbox: Path):
+    """
+    {path: (size, mtime_ns)} of the archives in inbox (not recursive).
+    """
+    found = {}
+    try:
+        with os.scandir(inbox) as it:
+            for entry in it:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in STAGE_EXTS:
+                    st = entry.stat()
+                    found[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return found
+
+
+def _readable(path: Path) -> bool:
+    # Windows keeps a file locked while the browser is still writing it
+    try:
+        with open(path, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+def watch_inbox(inbox=INBOX_DIR, interval=POLL_INTERVAL, stable_seconds=STABLE_SECONDS,
+                backlog=BACKLOG_SECONDS):
+    """
+    Polls inbox and stages every archive once its size and mtime have
+    not changed for stable_seconds. Archives older than backlog seconds
+    before the start are left alone. Runs until Ctrl+C.
+    """
+    inbox = Path(inbox)
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    since_ns = time.time_ns() - int(backlog * 1e9)
+    if prune_staging():
+        print("Old staged studies evicted")
+    print(f"Watching {inbox} -> {STAGING_DIR} (Ctrl+C to stop)")
+
+    seen = {}   # path -> ((size, mtime_ns), time first seen with that state)
+    try:
+        while True:
+            now = time.monotonic()
+            current = {p: state for p, state in _inbox_archives(inbox).items() if state[1] >= since_ns}
+            seen = {p: seen[p] if p in seen and seen[p][0] == state else (state, now)
+                    for p, state in current.items()}
+
+            for path, (state, since) in seen.items():
+                if now - since < stable_seconds:
+                    continue
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                if _is_handled(path, st) or not _readable(path):
+                    continue
+
+                print(f"[STAGE] {path.name}")
+                try:
+                    staged = stage_input(path)
+                except Exception as e:
+                    print(f"[FAIL] {path.name}: {e}")
+                    continue
+                meta = load_json(staged / STAGED_FILENAME, {})
+                print(f"[OK] {path.name}: {meta.get('patient') or '?'}, "
+                      f"{meta.get('files', 0)} files, {meta.get('series', 0)} series")
+                prune_staging()
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    watch_inbox()
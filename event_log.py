@@ -0,0 +1,350 @@
+import getpass
+import json
+import os
+import re
+from pathlib import Path
+
+from utils import now_iso, atomic_write_text, FSYNC_POLICY
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# One JSON record per line:
+#   {"ts": "2026-01-13T10:32:00", "event": "STAGE", "stage": "Design",
+#    "user": "lucas", "source": "datsys", "msg": ""}
+#
+# Log.idx.json is a disposable sidecar: byte offsets of each record per event
+# type, plus the log size it covers. It is caught up from the tail (or rebuilt)
+# whenever it lags behind the log, so writers that do not maintain it
+# (Blender macros) are fine.
+EVENT_LOG_FILENAME = "Log.jsonl"
+INDEX_FILENAME = "Log.idx.json"
+LEGACY_LOG_FILENAMES = ("Log.txt", "LOG.txt")
+
+FIELDS = ("ts", "event", "stage", "user", "source", "msg")
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+def log_path(project_dir) -> Path:
+    return Path(project_dir) / EVENT_LOG_FILENAME
+
+
+def index_path(project_dir) -> Path:
+    return Path(project_dir) / INDEX_FILENAME
+
+
+def current_user() -> str:
+    try:
+        return getpass.getuser()
+    except Exception:
+        return ""
+
+
+def make_event(event, msg="", stage="", user=None, source="datsys", ts=None) -> dict:
+    return {
+        "ts": ts or now_iso(),
+        "event": event,
+        "stage": stage or "",
+        "user": current_user() if user is None else user,
+        "source": source,
+        "msg": msg or "",
+    }
+
+
+def format_event(rec: dict) -> str:
+    """
+    Human-readable one-liner, same shape as the old Blender log lines.
+    """
+    parts = [rec.get("ts", "")[:16].replace("T", " "), rec.get("event", "")]
+    if rec.get("stage"):
+        parts.append(rec["stage"])
+    if rec.get("msg"):
+        parts.append(rec["msg"])
+    if rec.get("user"):
+        parts.append(f"by {rec['user']}")
+    return " | ".join(parts)
+
+# --------------------------------------------------
+# INDEX
+# --------------------------------------------------
+
+def _scan(path: Path, start: int, offsets: dict) -> int:
+    """
+    Adds offsets of complete records from byte `start` on.
+    Returns the byte position after the last complete line.
+    """
+    pos = start
+    with open(path, "rb") as f:
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # half-written tail, pick it up next time
+            try:
+                event = json.loads(line)["event"]
+            except (ValueError, KeyError, TypeError):
+                event = None
+            if event:
+                offsets.setdefault(event, []).append(pos)
+            pos += len(line)
+    return pos
+
+
+def _save_index(project_dir, idx):
+    atomic_write_text(index_path(project_dir), json.dumps(idx, separators=(",", ":")), "none")
+
+
+def read_index(project_dir) -> dict:
+    """
+    Returns {"size": int, "offsets": {event: [byte offsets]}},
+    brought up to date with the log.
+    """
+    path = log_path(project_dir)
+    if not path.exists():
+        return {"size": 0, "offsets": {}}
+
+    size = path.stat().st_size
+    try:
+        with open(index_path(project_dir), "r", encoding="utf-8") as f:
+            idx = json.load(f)
+        if idx["size"] > size:
+            raise ValueError("log shrank")
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        idx = {"size": 0, "offsets": {}}
+
+    if idx["size"] < size:
+        idx["size"] = _scan(path, idx["size"], idx["offsets"])
+        _save_index(project_dir, idx)
+
+    return idx
+
+
+def rebuild_index(project_dir) -> dict:
+    p = index_path(project_dir)
+    if p.exists():
+        p.unlink()
+    return read_index(project_dir)
+
+# --------------------------------------------------
+# WRITE
+# --------------------------------------------------
+
+def append_events(project_dir, records, fsync=None):
+    """
+    Appends records in one write and extends the sidecar index.
+    """
+    if not records:
+        return
+
+    path = log_path(project_dir)
+    idx = read_index(project_dir)
+
+    lines = [
+        (json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8")
+        for r in records
+    ]
+
+    with open(path, "ab") as f:
+        start = f.seek(0, os.SEEK_END)
+        f.write(b"".join(lines))
+        f.flush()
+        if (fsync or FSYNC_POLICY) != "none":
+            os.fsync(f.fileno())
+
+    if start != idx["size"]:
+        # someone else appended in between; let the reader catch up
+        read_index(project_dir)
+        return
+
+    pos = start
+    for r, line in zip(records, lines):
+        idx["offsets"].setdefault(r["event"], []).append(pos)
+        pos += len(line)
+    idx["size"] = pos
+    _save_index(project_dir, idx)
+
+
+def append_event(project_dir, event, msg="", stage="", user=None, source="datsys"):
+    append_events(project_dir, [make_event(event, msg, stage, user, source)])
+
+# --------------------------------------------------
+# READ
+# --------------------------------------------------
+
+def _read_at(path: Path, offset: int):
+    """
+    Record starting at offset, or None if offset isn't a record start
+    (stale index pointing mid-line, torn write).
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        try:
+            rec = json.loads(f.readline())
+        except ValueError:
+            return None
+    return rec if isinstance(rec, dict) else None
+
+
+def last_event(project_dir, event):
+    """
+    Latest record of one event type without scanning the log.
+    """
+    offsets = read_index(project_dir)["offsets"].get(event)
+    if not offsets:
+        return None
+
+    path = log_path(project_dir)
+    rec = _read_at(path, offsets[-1])
+    if rec is None or rec.get("event") != event:
+        # stale index (log rewritten by hand): rebuild once and retry
+        offsets = rebuild_index(project_dir)["offsets"].get(event)
+        rec = _read_at(path, offsets[-1]) if offsets else None
+    return rec
+
+
+def iter_events(project_dir, event=None):
+    path = log_path(project_dir)
+    if not path.exists():
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue    # torn / half-written line
+            if event is None or rec.get("event") == event:
+                yield rec
+
+# --------------------------------------------------
+# LEGACY CONVERTER (read-only on old logs)
+# --------------------------------------------------
+
+# [2025-01-13 10:32] STAGE → Design | message
+RE_STAGE = re.compile(r"^\[(?P<ts>[\d\- :]+)\] STAGE → (?P<stage>[^|]*?)(?: \| (?P<msg>.*))?$")
+# [2025-01-13 10:32] free text
+RE_BRACKET = re.compile(r"^\[(?P<ts>[\d\- :]+)\] (?P<msg>.*)$")
+# 2025-01-13 10:32 | EVENT | message | by user
+RE_PIPE = re.compile(r"^(?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d) \| (?P<event>[^|]+?) \| (?P<rest>.*)$")
+
+
+def _legacy_ts(ts: str) -> str:
+    return ts.strip().replace(" ", "T")
+
+
+def parse_legacy_line(line: str):
+    line = line.rstrip("\n")
+    if not line.strip() or line.strip() == "LOG.txt":
+        return None
+
+    m = RE_STAGE.match(line)
+    if m:
+        return make_event(
+            "STAGE", m["msg"] or "", m["stage"].strip(),
+            user="", source="legacy", ts=_legacy_ts(m["ts"]),
+        )
+
+    m = RE_BRACKET.match(line)
+    if m:
+        msg = m["msg"]
+        event = "INGEST" if msg.startswith("DICOM ingested") else "LOG"
+        return make_event(event, msg, user="", source="legacy", ts=_legacy_ts(m["ts"]))
+
+    m = RE_PIPE.match(line)
+    if m:
+        rest = m["rest"]
+        user = ""
+        if " | by " in rest:
+            rest, user = rest.rsplit(" | by ", 1)
+        return make_event(
+            m["event"].strip(), rest, user=user.strip(),
+            source="legacy-blender", ts=_legacy_ts(m["ts"]),
+        )
+
+    return make_event("LOG", line.strip(), user="", source="legacy", ts="")
+
+
+def has_legacy_log(project_dir) -> bool:
+    return any((Path(project_dir) / name).exists() for name in LEGACY_LOG_FILENAMES)
+
+
+def read_legacy_logs(project_dir) -> list:
+    """
+    Parses Log.txt and LOG.txt (same file on Windows) into records,
+    sorted by timestamp. The old files are never modified.
+    """
+    project_dir = Path(project_dir)
+    seen = []
+    records = []
+
+    for name in LEGACY_LOG_FILENAMES:
+        p = project_dir / name
+        if not p.exists() or any(os.path.samefile(p, s) for s in seen):
+            continue
+        seen.append(p)
+        with open(p, "r", encoding="utf-8", errors="replace") as f:
+            records.extend(r for r in map(parse_legacy_line, f) if r)
+
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def _record_key(rec: dict):
+    return tuple(str(rec.get(f, "")) for f in FIELDS)
+
+
+def convert_legacy_log(project_dir) -> int:
+    """
+    Merges the old text logs into Log.jsonl: records already in the log
+    are kept, legacy records not in it yet are added, all ordered by ts.
+    Running it again adds nothing. Returns the legacy records added.
+    """
+    path = log_path(project_dir)
+    legacy = read_legacy_logs(project_dir)
+
+    def log_size():
+        return path.stat().st_size if path.exists() else 0
+
+    while True:
+        size = log_size()
+        current = list(iter_events(project_dir))
+        seen = {_record_key(r) for r in current}
+        new = []
+        for rec in legacy:
+            key = _record_key(rec)
+            if key not in seen:
+                seen.add(key)
+                new.append(rec)
+        if not new:
+            return 0
+        merged = sorted(current + new, key=lambda r: r.get("ts", ""))
+        # an append while merging would be lost by the replace: start over
+        if log_size() == size:
+            break
+
+    atomic_write_text(
+        path,
+        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in merged),
+    )
+    rebuild_index(project_dir)
+    return len(new)
+
+
+# --------------------------------------------------
+# CLI ENTRY
+# --------------------------------------------------
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python event_log.py <project_path> [...]   (convert old Log.txt)")
+        sys.exit(1)
+
+    for arg in sys.argv[1:]:
+        n = convert_legacy_log(arg)
+        print(f"[OK] {arg}: {n} legacy events merged")
@@ -0,0 +1,128 @@
+import json
+import mmap
+import os
+
+from event_log import EVENT_LOG_FILENAME, format_event
+from scanner import iter_projects, stream_map
+from utils import CLIENTS_DIR
+
+# --------------------------------------------------
+# REVERSE TAIL (mmap)
+# --------------------------------------------------
+
+def iter_events_reverse(path):
+    """
+    Yields records newest-first by walking the file backwards through mmap.
+    Only the pages actually visited are read, so a 'last N' query on a long
+    log touches a few KB.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            while end > 0:
+                start = mm.rfind(b"\n", 0, end - 1) + 1
+                line = mm[start:end].strip()
+                end = start
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def _matches(rec, event, stage, user, until):
+    ts = rec.get("ts", "")
+    if event and rec.get("event") != event:
+        return False
+    if stage and rec.get("stage", "").lower() != stage.lower():
+        return False
+    if user and rec.get("user", "").lower() != user.lower():
+        return False
+    if until and ts[:10] > until:
+        return False
+    return True
+
+
+def query_case(path, event=None, stage=None, user=None, since=None, until=None, last=None):
+    """
+    Matching records of one log, newest first.
+    since / until are 'YYYY-MM-DD' (inclusive). The log is chronological,
+    so the backwards walk stops at the first record older than since.
+    """
+    out = []
+    for rec in iter_events_reverse(path):
+        if since and rec.get("ts", "")[:10] < since:
+            break
+        if _matches(rec, event, stage, user, until):
+            out.append(rec)
+            if last and len(out) >= last:
+                break
+    return out
+
+# --------------------------------------------------
+# CROSS-CASE QUERY
+# --------------------------------------------------
+
+def query_logs(clients_dir=CLIENTS_DIR, project=None, workers=None, **filters):
+    """
+    Yields (project_id, [records newest first]) as each case finishes,
+    reading all case logs concurrently.
+    """
+    def run(item):
+        client_id, entry = item
+        path = os.path.join(entry.path, EVENT_LOG_FILENAME)
+        return entry.name, query_case(path, **filters)
+
+    projects = (
+        (c, e) for c, e in iter_projects(clients_dir)
+        if not project or e.name == project
+    )
+
+    kw = {"workers": workers} if workers else {}
+    for project_id, recs in stream_map(run, projects, **kw):
+        if recs:
+            yield project_id, recs
+
+
+def print_query(**filters):
+    n = 0
+    for project_id, recs in query_logs(**filters):
+        for rec in recs:
+            print(f"{project_id:<15} {format_event(rec)}", flush=True)
+            n += 1
+    print(f"\n{n} event(s)")
+
+# --------------------------------------------------
+# INTERACTIVE
+# --------------------------------------------------
+
+def query_interactive():
+    print("\n--- Query logs --- (ENTER to skip a filter)")
+    event = input("Event (STAGE, INGEST, EXPORT, VERSION, PEEK...): ").strip().upper()
+    stage = input("Stage: ").strip()
+    project = input("ProjectID: ").strip()
+    user = input("User: ").strip()
+    since = input("Since (YYYY-MM-DD): ").strip()
+    until = input("Until (YYYY-MM-DD): ").strip()
+    last = input("Latest N per case: ").strip()
+
+    print()
+    print_query(
+        event=event or None,
+        stage=stage or None,
+        project=project or None,
+        user=user or None,
+        since=since or None,
+        until=until or None,
+        last=int(last) if last.isdigit() else None,
+    )
+    input("\nPress ENTER to return...")
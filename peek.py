@@ -1,12 +1,11 @@
+import copy
 from pathlib import Path
-from pydicom import dcmread
 
-from utils import load_json, save_json, now_iso
+from utils import load_json, now_iso
+from case_session import CaseSession
 from hospital_registry import choose_hospital_interactive
 from price_list import list_regions, get_price
 
-PEEK_CASE_FILENAME = "peekCase.json"
-
 PEEK_CASE_SCHEMA = {
     "id_caso": "",
     "nombre_paciente": "",
@@ -32,17 +31,8 @@ PEEK_CASE_SCHEMA = {
 # -------------------------
 
 def read_patient_from_dicom(dicom_dir: Path) -> str:
-    for p in dicom_dir.rglob("*"):
-        if not p.is_file():
-            continue
-        try:
-            ds = dcmread(p, stop_before_pixels=True)
-            name = getattr(ds, "PatientName", "")
-            if name:
-                return str(name)
-        except Exception:
-            pass
-    return ""
+    from dicom_manifest import patient_name
+    return patient_name(dicom_dir)
 
 
 def prompt_date(label: str) -> str:
@@ -61,18 +51,12 @@ def prompt_date(label: str) -> str:
 # INIT
 # -------------------------
 
-def init_peek_case(project_path: str):
-    project_dir = Path(project_path)
-    case_path = project_dir / PEEK_CASE_FILENAME
-
+def new_peek_case(project_dir: Path) -> dict:
     project_id = project_dir.name
     client_id = project_id.split("-")[1]
     client_json = project_dir.parent / f"client_{client_id}.json"
     client = load_json(client_json, {})
 
-    if case_path.exists():
-        return
-
     data = dict(PEEK_CASE_SCHEMA)
     data["id_caso"] = project_id
     data["nombre_doctor"] = client.get("name", "")
@@ -83,7 +67,13 @@ def init_peek_case(project_path: str):
     if dicom_dir.exists():
         data["nombre_paciente"] = read_patient_from_dicom(dicom_dir)
 
-    save_json(case_path, data)
+    return data
+
+
+def init_peek_case(project_path: str):
+    with CaseSession(project_path) as case:
+        if not case.exists:
+            case.set(**new_peek_case(case.project_dir))
 
 
 # -------------------------
@@ -91,12 +81,20 @@ def init_peek_case(project_path: str):
 # -------------------------
 
 def prompt_peek_case(project_path: str):
-    project_dir = Path(project_path)
-    case_path = project_dir / PEEK_CASE_FILENAME
-
-    init_peek_case(project_path)
-    data = load_json(case_path, dict(PEEK_CASE_SCHEMA))
-
+    # One session = one write of peekCase.json. Typing 0 drops what was
+    # entered in this prompt, as before (a new case is still created).
+    with CaseSession(project_path) as case:
+        if not case.exists:
+            case.set(**new_peek_case(case.project_dir))
+        data = copy.deepcopy(case.data)
+        if _prompt_fields(data):
+            case.set(**data)
+
+
+def _prompt_fields(data: dict) -> bool:
+    """
+    Edits data in place. False if the user stopped with 0.
+    """
     # Ensure missing keys (old cases)
     for k, v in PEEK_CASE_SCHEMA.items():
         data.setdefault(k, v)
@@ -108,7 +106,7 @@ def prompt_peek_case(project_path: str):
 
     val = input(f"nombre_paciente [{data.get('nombre_paciente','')}]: ").strip()
     if val == "0":
-        return
+        return False
     if val:
         data["nombre_paciente"] = val
 
@@ -126,7 +124,7 @@ def prompt_peek_case(project_path: str):
 
     val = input("> ").strip()
     if val == "0":
-        return
+        return False
     if val.isdigit() and 1 <= int(val) <= len(regions):
         data["region_anatomica"] = regions[int(val) - 1]
 
@@ -169,5 +167,4 @@ def prompt_peek_case(project_path: str):
     if val:
         data["notas"] = val
 
-    data["actualizado_en"] = now_iso()
-    save_json(case_path, data)
+    return True
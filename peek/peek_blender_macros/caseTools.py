@@ -2,11 +2,24 @@ import bpy
 import os
 import json
 import subprocess
+import sys
 from datetime import datetime
 
 DATSYS_ROOT = r"C:\Users\Lucas\Desktop\Hexamod\Clients\Hexamod\Datsys"
 PEEK_CASE_FILE = "peekCase.json"
-LOG_FILE = "LOG.txt"
+LOG_FILE = "Log.jsonl"  # same event log as DATSYS (see event_log.py)
+
+# Case service client (case_client.py): talks to `datsys serve` when it
+# runs and writes the file directly otherwise. Conditional writes (ETag)
+# stop Blender from silently overwriting edits made from DATSYS.
+if DATSYS_ROOT not in sys.path:
+    sys.path.append(DATSYS_ROOT)
+try:
+    import case_client
+except ImportError:
+    case_client = None
+
+_loaded_etag = None  # ETag of peekCase.json at the last reload
 
 # ==================================================
 # PATH HELPERS
@@ -40,8 +53,7 @@ def ensure_log_exists():
     if not path:
         return None
     if not os.path.exists(path):
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("LOG.txt\n\n")
+        open(path, "a", encoding="utf-8").close()
     return path
 
 # ==================================================
@@ -53,13 +65,17 @@ def append_log(event, message, user=""):
     if not path:
         return False, "Save the .blend file first"
 
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M")
-    user = user.strip() if user.strip() else "UNKNOWN"
-
-    line = f"{ts} | {event} | {message} | by {user}\n"
+    rec = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "event": event,
+        "stage": "",
+        "user": user.strip() if user.strip() else "UNKNOWN",
+        "source": "blender",
+        "msg": message,
+    }
 
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(line)
+    with open(path, "a", encoding="utf-8", newline="\n") as f:
+        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
 
     return True, None
 
@@ -68,20 +84,41 @@ def append_log(event, message, user=""):
 # ==================================================
 
 def load_peek_case():
+    global _loaded_etag
     path = get_peek_case_path()
     if not path or not os.path.exists(path):
         return {}
+
+    if case_client:
+        try:
+            data, _loaded_etag = case_client.get_case(get_case_root())
+            return data
+        except Exception:
+            pass  # fall through to a plain read
+
     try:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception:
         return {}
 
-def save_peek_case(data):
+def save_peek_case(data, user=""):
+    global _loaded_etag
     path = get_peek_case_path()
     if not path:
         return False, "Save the .blend file first"
 
+    if case_client and _loaded_etag:
+        fields = {k: data[k] for k in PEEK_FIELDS if k in data}
+        try:
+            _loaded_etag = case_client.update_case(
+                get_case_root(), fields, _loaded_etag, source="blender",
+                user=user.strip() or "UNKNOWN",
+            )
+        except case_client.CaseConflict as e:
+            return False, f"{e} (Reload PEEK Case)"
+        return True, None
+
     data["actualizado_en"] = datetime.now().isoformat()
 
     with open(path, "w", encoding="utf-8") as f:
@@ -114,21 +151,25 @@ class OBJECT_OT_save_peek_case(bpy.types.Operator):
 
     def execute(self, context):
         scn = context.scene
-        data = load_peek_case()
+        # with an ETag from the last reload, send only the fields; reading
+        # again here would take the newer ETag and hide a conflict
+        data = {} if (case_client and _loaded_etag) else load_peek_case()
 
         for k in PEEK_FIELDS:
             data[k] = getattr(scn, k)
 
-        ok, err = save_peek_case(data)
+        ok, err = save_peek_case(data, scn.case_user)
         if not ok:
             self.report({'ERROR'}, err)
             return {'CANCELLED'}
 
-        append_log(
-            "PEEK",
-            "PEEK case fields updated",
-            scn.case_user
-        )
+        if not (case_client and _loaded_etag):
+            # the case client logs its own PEEK event
+            append_log(
+                "PEEK",
+                "PEEK case fields updated",
+                scn.case_user
+            )
 
         self.report({'INFO'}, "PEEK case saved")
         return {'FINISHED'}
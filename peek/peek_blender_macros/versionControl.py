@@ -1,6 +1,7 @@
 import bpy
 import re
 import os
+import json
 from datetime import datetime
 
 # -------------------------------------------------
@@ -46,17 +47,21 @@ def append_to_project_log(event, msg, user=""):
     if not root:
         return False
 
-    log_path = os.path.join(root, "LOG.txt")
-    if not os.path.exists(log_path):
-        return False
-
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M")
-    line = f"{ts} | {event} | {msg}"
-    if user:
-        line += f" | by {user}"
-
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
+    # created if missing, like caseTools.ensure_log_exists: projects from
+    # before Log.jsonl only have Log.txt (DATSYS merges it on open)
+    log_path = os.path.join(root, "Log.jsonl")
+
+    rec = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "event": event,
+        "stage": "",
+        "user": user,
+        "source": "blender",
+        "msg": msg,
+    }
+
+    with open(log_path, "a", encoding="utf-8", newline="\n") as f:
+        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
 
     return True
 
@@ -0,0 +1,301 @@
+import os
+import sys
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils import DATA_DIR, ensure_dir
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+PERF_LOG = os.path.join(DATA_DIR, "perf.jsonl")
+PERF_MAX_BYTES = 1024 * 1024    # rotate perf.jsonl -> perf.jsonl.1 past this size
+PERF_BACKUPS = 3
+PERF_LOCK = os.path.join(DATA_DIR, ".perf.lock")   # one process rotates at a time
+PERF_LOCK_TIMEOUT = 1.0
+
+# DATSYS_PERF=0 turns spans into no-ops
+PERF_ENABLED = os.environ.get("DATSYS_PERF", "1") != "0"
+
+# --------------------------------------------------
+# PROCESS COUNTERS
+# --------------------------------------------------
+
+# Files opened / folders listed, counted process-wide from audit events
+# (PEP 578). Spans report deltas, so nested spans and worker threads are
+# attributed to every span open at the time.
+_counts = {"files_read": 0, "files_written": 0, "dirs_listed": 0}
+_hook_installed = False
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND
+_OWN_FILES = {"/proc/self/io", PERF_LOG, PERF_LOCK}   # the instrumentation's own I/O
+
+
+def _audit(event, args):
+    if event == "open":
+        path, mode, flags = args
+        if isinstance(path, int) or path in _OWN_FILES:
+            return  # open(fd) was counted by its os.open; our own files don't count
+        if mode is not None:
+            writing = any(c in mode for c in "wax+")
+        else:
+            writing = bool(flags & _WRITE_FLAGS)
+        _counts["files_written" if writing else "files_read"] += 1
+    elif event in ("os.scandir", "os.listdir"):
+        _counts["dirs_listed"] += 1
+
+
+def _install_hook():
+    global _hook_installed
+    if not _hook_installed:
+        sys.addaudithook(_audit)    # can't be removed; _audit stays cheap
+        _hook_installed = True
+
+
+def _io_bytes():
+    """
+    (read_bytes, write_bytes) for the whole process, or (None, None)
+    where the platform doesn't expose them.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/io", "rb") as f:
+                fields = dict(line.split(b":") for line in f.read().splitlines())
+            return int(fields[b"rchar"]), int(fields[b"wchar"])
+        except (OSError, KeyError, ValueError):
+            return None, None
+
+    if os.name == "nt":
+        import ctypes
+        from ctypes import wintypes
+
+        class IO_COUNTERS(ctypes.Structure):
+            _fields_ = [(n, ctypes.c_ulonglong) for n in (
+                "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+                "ReadTransferCount", "WriteTransferCount", "OtherTransferCount",
+            )]
+
+        io = IO_COUNTERS()
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        if kernel32.GetProcessIoCounters(kernel32.GetCurrentProcess(), ctypes.byref(io)):
+            return io.ReadTransferCount, io.WriteTransferCount
+
+    return None, None
+
+
+def _delta(after, before):
+    if after is None or before is None:
+        return None
+    return after - before
+
+# --------------------------------------------------
+# SPANS
+# --------------------------------------------------
+
+_write_lock = threading.Lock()
+_local = threading.local()
+
+
+def _rotate():
+    """
+    Several processes append here (ingest -j): the size is re-checked
+    under the allocator's O_EXCL lock, so only one of them rotates.
+    """
+    from project_allocator import AllocatorLock
+
+    try:
+        with AllocatorLock(DATA_DIR, PERF_LOCK_TIMEOUT, os.path.basename(PERF_LOCK)):
+            if os.path.getsize(PERF_LOG) <= PERF_MAX_BYTES:
+                return  # another process rotated first
+            for i in range(PERF_BACKUPS - 1, 0, -1):
+                src = f"{PERF_LOG}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{PERF_LOG}.{i + 1}")
+            os.replace(PERF_LOG, f"{PERF_LOG}.1")
+    except RuntimeError:
+        pass    # lock busy: keep appending, the next write retries
+
+
+def _write(rec):
+    line = json.dumps(rec, ensure_ascii=False) + "\n"
+    with _write_lock:
+        try:
+            ensure_dir(DATA_DIR)
+            if os.path.exists(PERF_LOG) and os.path.getsize(PERF_LOG) > PERF_MAX_BYTES:
+                _rotate()
+            with open(PERF_LOG, "a", encoding="utf-8", newline="\n") as f:
+                f.write(line)
+        except OSError:
+            pass  # timing must never break the operation it measures
+
+
+@contextmanager
+def span(op, **attrs):
+    """
+    Times a block and appends one record to data/perf.jsonl:
+    wall / cpu seconds, bytes read / written, files opened, folders listed.
+    Yields attrs so the block can add details (e.g. row counts).
+    """
+    if not PERF_ENABLED:
+        yield attrs
+        return
+
+    _install_hook()
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    parent = stack[-1] if stack else None
+    stack.append(op)
+
+    counts0 = dict(_counts)
+    read0, written0 = _io_bytes()
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        yield attrs
+        ok = True
+    finally:
+        wall = time.perf_counter() - t0
+        cpu = time.process_time() - cpu0
+        read1, written1 = _io_bytes()
+        stack.pop()
+
+        rec = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "op": op,
+            "parent": parent,
+            "ok": ok,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "read_bytes": _delta(read1, read0),
+            "write_bytes": _delta(written1, written0),
+        }
+        rec.update({k: _counts[k] - counts0[k] for k in _counts})
+        rec.update({k: v for k, v in attrs.items() if k not in rec})
+        _write(rec)
+
+
+def timed(op):
+    """
+    Decorator form of span().
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(op):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+# --------------------------------------------------
+# PROFILER
+# --------------------------------------------------
+
+def run_profiled(fn, *args, **kwargs):
+    """
+    Runs fn under cProfile and dumps data/profile-<timestamp>.pstats.
+    Open it with: python -m pstats <file>
+    """
+    import cProfile
+
+    ensure_dir(DATA_DIR)
+    out = os.path.join(DATA_DIR, f"profile-{datetime.now():%Y%m%d-%H%M%S}.pstats")
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(fn, *args, **kwargs)
+    finally:
+        prof.dump_stats(out)
+        print(f"[OK] Profile written: {out}", file=sys.stderr)
+
+# --------------------------------------------------
+# REPORT
+# --------------------------------------------------
+
+def iter_records():
+    """
+    Oldest first, across rotated files.
+    """
+    paths = [f"{PERF_LOG}.{i}" for i in range(PERF_BACKUPS, 0, -1)] + [PERF_LOG]
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue    # torn last line
+
+
+def _percentile(sorted_values, pct):
+    # nearest rank
+    idx = max(0, -(-len(sorted_values) * pct // 100) - 1)
+    return sorted_values[int(idx)]
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def perf_summary(op=None, since=None):
+    """
+    Per-operation stats: count, failures, p50 / p95 / max wall time,
+    mean MB read / written and files opened.
+    """
+    groups = {}
+    for rec in iter_records():
+        if op and rec.get("op") != op:
+            continue
+        if since and rec.get("ts", "") < since:
+            continue
+        groups.setdefault(rec["op"], []).append(rec)
+
+    out = []
+    for name, recs in sorted(groups.items()):
+        walls = sorted(r["wall_s"] for r in recs)
+        read = _mean([r.get("read_bytes") for r in recs])
+        written = _mean([r.get("write_bytes") for r in recs])
+        out.append({
+            "op": name,
+            "n": len(recs),
+            "failed": sum(1 for r in recs if not r.get("ok")),
+            "p50_s": _percentile(walls, 50),
+            "p95_s": _percentile(walls, 95),
+            "max_s": walls[-1],
+            "read_mb": read / 1e6 if read is not None else None,
+            "write_mb": written / 1e6 if written is not None else None,
+            "files": _mean([r.get("files_read", 0) + r.get("files_written", 0) for r in recs]),
+        })
+    return out
+
+
+def print_report(op=None, since=None):
+    rows = perf_summary(op, since)
+    if not rows:
+        print(f"No timings recorded yet ({PERF_LOG}).")
+        return
+
+    def mb(v):
+        return f"{v:9.1f}" if v is not None else f"{'-':>9}"
+
+    print(f"{'Operation':<24} {'N':>5} {'Fail':>4} {'p50 s':>8} {'p95 s':>8} {'max s':>8} "
+          f"{'MB read':>9} {'MB writ':>9} {'files':>7}")
+    print("-" * 90)
+    for r in rows:
+        print(
+            f"{r['op']:<24} {r['n']:>5} {r['failed']:>4} {r['p50_s']:>8.3f} "
+            f"{r['p95_s']:>8.3f} {r['max_s']:>8.3f} {mb(r['read_mb'])} "
+            f"{mb(r['write_mb'])} {r['files']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    print_report()
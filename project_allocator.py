@@ -0,0 +1,152 @@
+import json
+import os
+import socket
+import time
+from pathlib import Path
+
+from utils import CLIENTS_DIR, save_json, now_iso
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# The lock is a file created with O_CREAT | O_EXCL: atomic on local disks,
+# SMB shares and Windows alike. It only lives for the few milliseconds it
+# takes to bump project_count.
+LOCK_FILENAME = ".project_count.lock"
+LOCK_TIMEOUT = 10.0     # seconds to wait before giving up
+LOCK_STALE = 60.0       # a lock older than this was left by a crashed process
+RETRY_DELAY = 0.02      # first retry; doubles up to RETRY_MAX
+RETRY_MAX = 0.25
+
+# --------------------------------------------------
+# LOCK
+# --------------------------------------------------
+
+class AllocatorLock:
+    """
+    Cross-process mutex on a folder. Other shared files can be guarded
+    with their own lock filename (perf.jsonl rotation does).
+    """
+
+    def __init__(self, client_dir, timeout=LOCK_TIMEOUT, filename=LOCK_FILENAME):
+        self.path = Path(client_dir) / filename
+        self.timeout = timeout
+        self.token = None   # contents of the lock file this instance created
+
+    def _try_create(self):
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        token = f"{socket.gethostname()} pid={os.getpid()} at={now_iso()} id={os.urandom(4).hex()}\n"
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(token)
+        self.token = token
+        return True
+
+    def _owns(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read() == self.token
+        except FileNotFoundError:
+            return False
+
+    def _break_if_stale(self):
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return
+        age = time.time() - st.st_mtime
+        if age <= LOCK_STALE:
+            return
+
+        # Claim it with one atomic rename: of several processes that saw it
+        # stale, exactly one gets the file. unlink() here could delete a lock
+        # another process re-created in the meantime.
+        claimed = self.path.with_name(f"{self.path.name}.stale-{socket.gethostname()}-{os.getpid()}")
+        try:
+            os.rename(self.path, claimed)
+        except FileNotFoundError:
+            return
+        except OSError:
+            return  # Windows: someone else's claim file, or the lock is open
+        moved = claimed.stat()
+        if (moved.st_ino, moved.st_mtime_ns) != (st.st_ino, st.st_mtime_ns):
+            # reclaimed and re-created between stat and rename: hand it back
+            self._restore(claimed)
+            return
+        print(f"[WARN] Removing stale lock ({age:.0f}s old): {self.path}")
+        claimed.unlink()
+
+    def _restore(self, claimed):
+        """
+        Puts a live lock back, unless a new one was created meanwhile.
+        Then it stays aside: it is someone's lock, and the lock path now
+        belongs to another process. Neither is deleted here.
+        """
+        try:
+            if os.name == "nt":
+                os.rename(claimed, self.path)   # never replaces on Windows
+            else:
+                os.link(claimed, self.path)     # fails if path exists
+                claimed.unlink()                # only the aside name
+        except FileExistsError:
+            print(f"[WARN] Lock taken while being checked, left aside: {claimed}")
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        delay = RETRY_DELAY
+
+        while not self._try_create():
+            self._break_if_stale()
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"Could not take lock within {self.timeout:.0f}s: {self.path}"
+                )
+            time.sleep(delay)
+            delay = min(delay * 2, RETRY_MAX)
+
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # held past LOCK_STALE, it may have been broken and re-taken:
+        # only ever delete our own
+        if self._owns(self.path):
+            self.path.unlink()
+        else:
+            print(f"[WARN] Lock was taken over while held: {self.path}")
+        return False
+
+# --------------------------------------------------
+# ALLOCATION
+# --------------------------------------------------
+
+def reserve_suffixes(client_id, n=1, clients_dir=CLIENTS_DIR, timeout=LOCK_TIMEOUT):
+    """
+    Reserves n consecutive project numbers for a client and returns them.
+    project_count in client_<ID>.json is bumped once, under the lock.
+    """
+    if n < 1:
+        raise ValueError("n must be >= 1")
+
+    client_dir = Path(clients_dir) / client_id
+    client_json = client_dir / f"client_{client_id}.json"
+    if not client_json.exists():
+        raise RuntimeError(f"Client not found: {client_id}")
+
+    with AllocatorLock(client_dir, timeout):
+        # Read straight from disk: the load_json cache validates by
+        # (mtime, size), and 5 -> 6 keeps the size on coarse-mtime shares.
+        with open(client_json, "r", encoding="utf-8") as f:
+            client = json.load(f)
+
+        first = client.get("project_count", 0) + 1
+        client["project_count"] = first + n - 1
+        save_json(client_json, client)
+
+    return list(range(first, first + n))
+
+
+def allocate_suffix(client_id, clients_dir=CLIENTS_DIR):
+    return reserve_suffixes(client_id, 1, clients_dir)[0]
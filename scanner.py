@@ -0,0 +1,97 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from utils import CLIENTS_DIR
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# clients/ lives on an SMB share: every stat/open is a network round trip.
+# Threads overlap those round trips; the bound keeps the share responsive.
+DEFAULT_WORKERS = 16
+
+PEEK_CASE_FILENAME = "peekCase.json"
+
+# --------------------------------------------------
+# DIRECTORY WALK (os.scandir, cached DirEntry types)
+# --------------------------------------------------
+
+def iter_subdirs(path):
+    """
+    Yields DirEntry for each subfolder of path, except hidden ones
+    (clients/.staging is not a client).
+    DirEntry.is_dir() uses the type returned by the listing itself,
+    so no extra stat per entry.
+    """
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir() and not entry.name.startswith("."):
+                    yield entry
+    except FileNotFoundError:
+        return
+
+
+def iter_projects(clients_dir=CLIENTS_DIR):
+    """
+    Yields (client_id, project DirEntry) for every project folder.
+    """
+    for client in iter_subdirs(clients_dir):
+        for project in iter_subdirs(client.path):
+            yield client.name, project
+
+# --------------------------------------------------
+# BOUNDED PARALLEL MAP (streaming)
+# --------------------------------------------------
+
+def stream_map(fn, items, workers=DEFAULT_WORKERS):
+    """
+    Runs fn over items on a bounded thread pool and yields results
+    as they complete (not in input order).
+
+    At most 2 * workers calls are in flight, so huge trees never queue
+    thousands of futures up front.
+    """
+    items = iter(items)
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= workers * 2:
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                pending.remove(fut)
+                yield fut.result()
+
+                nxt = next(items, None)
+                if nxt is not None:
+                    pending.append(pool.submit(fn, nxt))
+
+# --------------------------------------------------
+# PROJECT-LEVEL READS
+# --------------------------------------------------
+
+def _stat_peek_case(item):
+    client_id, project = item
+    peek_path = os.path.join(project.path, PEEK_CASE_FILENAME)
+    try:
+        st = os.stat(peek_path)
+    except FileNotFoundError:
+        return None
+    return client_id, project.name, peek_path, st
+
+
+def scan_peek_cases(clients_dir=CLIENTS_DIR, workers=DEFAULT_WORKERS):
+    """
+    Yields (client_id, project_id, peek_path, stat) for every project
+    that has a peekCase.json, streaming as the stats come back.
+    """
+    for res in stream_map(_stat_peek_case, iter_projects(clients_dir), workers):
+        if res is not None:
+            yield res
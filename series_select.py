@@ -0,0 +1,88 @@
+import math
+
+from dicom_manifest import ensure_manifest, series_files
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+# same words the Slicer script used on volume names
+KEYWORDS = ["bone", "hard", "tac", "axial", "dr", "hueso", "oseo"]
+
+# reconstruction kernels for bone / sharp (Siemens, GE, Philips, Canon)
+BONE_KERNELS = ["bone", "sharp", "b6", "b7", "b8", "br6", "hr6", "h6", "h7", "yd", "ye", "fc3", "fc8"]
+
+VOLUME_MODALITIES = ("CT",)
+MIN_SLICES = 20         # fewer is a scout / localizer, not a volume
+MAX_SLICE_BONUS = 1000  # slice count stops counting here
+
+# --------------------------------------------------
+# SCORING
+# --------------------------------------------------
+
+def _text(value) -> str:
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return str(value or "")
+
+
+def score_series(s: dict) -> float:
+    """
+    Higher = better candidate for the 3D volume. s = one entry of
+    manifest["series"].
+    """
+    score = 0.0
+
+    if s.get("Modality") not in VOLUME_MODALITIES:
+        score -= 100
+    if "LOCALIZER" in _text(s.get("ImageType")).upper() or s["count"] < MIN_SLICES:
+        score -= 50
+
+    desc = s.get("SeriesDescription", "").lower()
+    score += 10 * sum(1 for k in KEYWORDS if k in desc)
+
+    kernel = _text(s.get("ConvolutionKernel")).lower()
+    if any(k in kernel for k in BONE_KERNELS):
+        score += 15
+
+    # thin slices: 0.5 mm -> +7.5, 1 mm -> +5, 2 mm and up -> 0
+    try:
+        thickness = float(s.get("SliceThickness"))
+        score += max(0.0, 2.0 - thickness) * 5
+    except (TypeError, ValueError):
+        pass
+
+    # more slices = more coverage: 100 -> +4.6, 1000 -> +6.9
+    score += math.log(min(s["count"], MAX_SLICE_BONUS))
+    return round(score, 2)
+
+
+def rank_series(manifest: dict):
+    """
+    [(score, series_uid, summary)], best first.
+    """
+    ranked = [(score_series(s), uid, s) for uid, s in manifest["series"].items()]
+    ranked.sort(key=lambda r: r[0], reverse=True)
+    return ranked
+
+
+def best_series(dicom_dir):
+    """
+    (series_uid, [relative paths]) of the winning series, or None when
+    the folder holds no series.
+    """
+    manifest = ensure_manifest(dicom_dir)
+    ranked = rank_series(manifest)
+    if not ranked:
+        return None
+    _, uid, _ = ranked[0]
+    return uid, series_files(manifest, uid)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) != 2:
+        print("Usage: python series_select.py <DICOM folder>")
+        sys.exit(1)
+    for score, uid, s in rank_series(ensure_manifest(sys.argv[1])):
+        print(f"{score:>7.2f}  {s['Modality']:<3} {s['count']:>5}  {s['SeriesDescription']}  {uid}")
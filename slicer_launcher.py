@@ -1,18 +1,33 @@
 import subprocess
 from pathlib import Path
 
+from dicom_archive import ensure_series_files
+from perf import timed
+from series_select import best_series
+
 SLICER_EXE = Path(r"C:\Users\Lucas\AppData\Local\slicer.org\Slicer 5.8.0\Slicer.exe")
 SLICER_SCRIPT = Path(__file__).parent / "tools/slicer_autoload_volume.py"
 
+@timed("launch_slicer")
 def launch_slicer_with_dicom(dicom_dir):
     dicom_dir = Path(dicom_dir)  # 🔧 FIX
 
     if not dicom_dir.exists():
         raise RuntimeError(f"DICOM folder not found: {dicom_dir}")
 
+    # the series is chosen here from the manifest; Slicer loads only that one
+    args = [str(dicom_dir)]
+    best = best_series(dicom_dir)
+    if best:
+        series_uid, _ = best
+        # archive-backed cases: only this series is extracted
+        files = ensure_series_files(dicom_dir, series_uid)
+        print(f"Series: {series_uid} ({len(files)} files)")
+        args.append(series_uid)
+
     subprocess.Popen([
         str(SLICER_EXE),
         "--python-script",
         str(SLICER_SCRIPT),
-        str(dicom_dir),
+        *args,
     ])
\ No newline at end of file
@@ -0,0 +1,140 @@
+import fnmatch
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from utils import save_json, now_iso
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+MANIFEST_FILENAME = ".template_manifest.json"
+
+# Files a project edits after creation. They always get their own data
+# (reflink or copy), never a hardlink shared with the template.
+WRITABLE_PATTERNS = (
+    "*.blend",
+    "*.json",
+    "*.jsonl",
+    "*.txt",
+    "*.mrml",
+    "*.seg.nrrd",
+)
+
+# Hardlinks share data with the template, so they are only used for assets
+# nothing writes to, and only where the saving is worth it (not .gitkeep).
+HARDLINK_MIN_SIZE = 64 * 1024
+
+FICLONE = 0x40049409    # Linux ioctl: share extents copy-on-write (btrfs, xfs)
+
+# --------------------------------------------------
+# LINK / COPY PRIMITIVES
+# --------------------------------------------------
+
+def _reflink(src, dst) -> bool:
+    """
+    Copy-on-write clone. False if the platform / filesystem can't do it.
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            import fcntl
+            with open(src, "rb") as s, open(dst, "wb") as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        elif sys.platform == "darwin":
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+                return False
+        else:
+            return False
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+    shutil.copystat(src, dst)
+    return True
+
+
+def _hardlink(src, dst) -> bool:
+    try:
+        os.link(src, dst)
+    except OSError:
+        # cross-device (template and project on different shares) or unsupported
+        return False
+    return True
+
+
+def is_writable(rel_path: str) -> bool:
+    name = Path(rel_path).name.lower()
+    return any(fnmatch.fnmatch(name, pat) for pat in WRITABLE_PATTERNS)
+
+# --------------------------------------------------
+# MATERIALIZE
+# --------------------------------------------------
+
+def materialize_template(template_dir, project_dir, renames=None):
+    """
+    Instantiates template_dir into project_dir:
+      1. reflink (CoW) where the filesystem supports it
+      2. hardlink for read-only assets
+      3. plain copy for files the project will modify
+    renames maps template-relative paths to project-relative paths
+    (e.g. Blender/PEEK.blend -> Blender/<ID>.blend).
+    Writes a manifest of what was linked and what was copied.
+    Returns the manifest.
+    """
+    template_dir = Path(template_dir)
+    project_dir = Path(project_dir)
+    renames = {Path(k).as_posix(): Path(v).as_posix() for k, v in (renames or {}).items()}
+
+    if not template_dir.exists():
+        raise RuntimeError(f"Template folder missing: {template_dir}")
+
+    files = {}
+    counts = {"reflink": 0, "hardlink": 0, "copy": 0}
+    can_reflink = True
+
+    for root, dirs, names in os.walk(template_dir):
+        rel_root = Path(root).relative_to(template_dir)
+        (project_dir / rel_root).mkdir(parents=True, exist_ok=True)
+
+        for name in names:
+            src_rel = (rel_root / name).as_posix()
+            dst_rel = renames.get(src_rel, src_rel)
+            src = template_dir / src_rel
+            dst = project_dir / dst_rel
+            dst.parent.mkdir(parents=True, exist_ok=True)
+
+            if dst.exists():
+                raise RuntimeError(f"Refusing to overwrite: {dst}")
+
+            if can_reflink and _reflink(src, dst):
+                mode = "reflink"
+            else:
+                # one failure means this filesystem can't; don't retry per file
+                can_reflink = False
+                linkable = (
+                    dst_rel == src_rel
+                    and not is_writable(dst_rel)
+                    and src.stat().st_size >= HARDLINK_MIN_SIZE
+                )
+                if linkable and _hardlink(src, dst):
+                    mode = "hardlink"
+                else:
+                    shutil.copy2(src, dst)
+                    mode = "copy"
+
+            files[dst_rel] = mode
+            counts[mode] += 1
+
+    manifest = {
+        "template": str(template_dir),
+        "created_at": now_iso(),
+        "counts": counts,
+        "files": files,
+    }
+    save_json(project_dir / MANIFEST_FILENAME, manifest)
+    return manifest
@@ -0,0 +1,226 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import case_client
+from case_client import UPDATE_LOCK_FILENAME, CaseConflict, CaseNotFound, direct_update, etag_for
+from case_service import make_server
+from case_session import PEEK_CASE_FILENAME
+from event_log import iter_events
+from project_allocator import AllocatorLock
+
+PROJECT_ID = "QA18-C01-PK1"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class CaseServiceTest(unittest.TestCase):
+    """
+    The service runs in-process on a free port (make_server(port=0)),
+    against a throwaway clients/ tree.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clients_dir = self.tmp.name
+        self.project_dir = Path(self.clients_dir) / "C01" / PROJECT_ID
+        self.project_dir.mkdir(parents=True)
+        (self.project_dir / PEEK_CASE_FILENAME).write_text(
+            json.dumps({"estado_caso": "Nuevo", "nombre_paciente": "DOE^JOHN"}), encoding="utf-8"
+        )
+
+        self.server = make_server(self.clients_dir, port=0)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self._port = case_client.SERVICE_PORT
+        case_client.SERVICE_PORT = self.port
+
+    def tearDown(self):
+        case_client.SERVICE_PORT = self._port
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.tmp.cleanup()
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        (status, parsed body or None, ETag header); HTTP errors included.
+        """
+        url = f"http://127.0.0.1:{self.port}{path}"
+        data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode("utf-8")
+        req = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+        try:
+            with urllib.request.urlopen(req, timeout=5) as resp:
+                status, raw, etag = resp.status, resp.read(), resp.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            status, raw, etag = e.code, e.read(), e.headers.get("ETag")
+        return status, json.loads(raw) if raw else None, etag
+
+    def current_etag(self):
+        return etag_for(self.project_dir / PEEK_CASE_FILENAME)
+
+    # ---- GET ----
+
+    def test_get_returns_case_and_etag(self):
+        status, body, etag = self.request("GET", f"/projects/{PROJECT_ID}")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["nombre_paciente"], "DOE^JOHN")
+        self.assertEqual(etag, self.current_etag())
+
+    def test_get_if_none_match_is_304(self):
+        _, _, etag = self.request("GET", f"/projects/{PROJECT_ID}")
+        status, body, etag_304 = self.request("GET", f"/projects/{PROJECT_ID}", headers={"If-None-Match": etag})
+        self.assertEqual(status, 304)
+        self.assertIsNone(body)
+        self.assertEqual(etag_304, etag)
+
+    def test_get_sees_edits_made_behind_the_service(self):
+        self.request("GET", f"/projects/{PROJECT_ID}")
+        (self.project_dir / PEEK_CASE_FILENAME).write_text(
+            json.dumps({"estado_caso": "Design", "nombre_paciente": "DOE^JOHN"}), encoding="utf-8"
+        )
+        status, body, _ = self.request("GET", f"/projects/{PROJECT_ID}")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["estado_caso"], "Design")
+
+    def test_get_unknown_project_is_404(self):
+        status, _, _ = self.request("GET", "/projects/QA18-C01-PK9")
+        self.assertEqual(status, 404)
+
+    # ---- PATCH ----
+
+    def patch(self, body, etag):
+        headers = {"Content-Type": "application/json"}
+        if etag:
+            headers["If-Match"] = etag
+        return self.request("PATCH", f"/projects/{PROJECT_ID}", body, headers)
+
+    def test_patch_with_matching_etag(self):
+        status, body, new_etag = self.patch({"fields": {"estado_caso": "Design"}}, self.current_etag())
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {"ok": True})
+        self.assertEqual(new_etag, self.current_etag())
+
+        data = json.loads((self.project_dir / PEEK_CASE_FILENAME).read_text(encoding="utf-8"))
+        self.assertEqual(data["estado_caso"], "Design")
+        self.assertEqual(data["nombre_paciente"], "DOE^JOHN")
+
+    def test_patch_with_stale_etag_is_412(self):
+        old = self.current_etag()
+        self.assertEqual(self.patch({"fields": {"estado_caso": "Design"}}, old)[0], 200)
+        status, _, _ = self.patch({"fields": {"estado_caso": "Printing"}}, old)
+        self.assertEqual(status, 412)
+
+        data = json.loads((self.project_dir / PEEK_CASE_FILENAME).read_text(encoding="utf-8"))
+        self.assertEqual(data["estado_caso"], "Design")
+
+    def test_patch_without_if_match_is_428(self):
+        status, _, _ = self.patch({"fields": {"estado_caso": "Design"}}, None)
+        self.assertEqual(status, 428)
+
+    def test_patch_bad_bodies_are_400(self):
+        etag = self.current_etag()
+        for body in (b"not json", [1, 2], "text", 3, {"no_fields": 1}, {"fields": [1]}):
+            with self.subTest(body=body):
+                status, resp, _ = self.patch(body, etag)
+                self.assertEqual(status, 400)
+                self.assertIn("bad request", resp["error"])
+        self.assertEqual(self.current_etag(), etag)
+
+    def test_patch_same_size_rewrite_in_one_mtime_tick_is_412(self):
+        # coarse-mtime share: same size, same mtime, same inode
+        peek_path = self.project_dir / PEEK_CASE_FILENAME
+        etag = self.current_etag()
+        st = peek_path.stat()
+        with open(peek_path, "r+b") as f:
+            data = f.read()
+            f.seek(0)
+            f.write(data.replace(b"Nuevo", b"Listo"))
+        os.utime(peek_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        status, _, _ = self.patch({"fields": {"estado_caso": "Design"}}, etag)
+        self.assertEqual(status, 412)
+
+    def test_etag_from_the_mtime_window_stays_valid_after_it(self):
+        etag = self.current_etag()
+        self.assertIn(":", etag)
+        granularity = case_client.MTIME_GRANULARITY_NS
+        case_client.MTIME_GRANULARITY_NS = 0
+        try:
+            self.assertNotIn(":", self.current_etag())
+            status, _, _ = self.patch({"fields": {"estado_caso": "Design"}}, etag)
+        finally:
+            case_client.MTIME_GRANULARITY_NS = granularity
+        self.assertEqual(status, 200)
+
+    def test_patch_records_the_user(self):
+        body = {"fields": {"estado_caso": "Design"}, "source": "blender", "user": "ana"}
+        self.assertEqual(self.patch(body, self.current_etag())[0], 200)
+        rec = list(iter_events(self.project_dir, "PEEK"))[-1]
+        self.assertEqual((rec["user"], rec["source"]), ("ana", "blender"))
+
+        self.assertEqual(self.patch(dict(body, user=5), self.current_etag())[0], 400)
+
+    def test_patch_while_update_lock_is_held_is_503(self):
+        timeout = case_client.UPDATE_LOCK_TIMEOUT
+        case_client.UPDATE_LOCK_TIMEOUT = 0.1
+        try:
+            with AllocatorLock(self.project_dir, 1.0, UPDATE_LOCK_FILENAME):
+                status, _, _ = self.patch({"fields": {"estado_caso": "Design"}}, self.current_etag())
+                with self.assertRaises(RuntimeError):
+                    direct_update(self.project_dir, {"estado_caso": "Design"}, self.current_etag())
+        finally:
+            case_client.UPDATE_LOCK_TIMEOUT = timeout
+        self.assertEqual(status, 503)
+
+    def test_patch_unknown_project_is_404(self):
+        status, _, _ = self.request(
+            "PATCH", "/projects/QA18-C01-PK9",
+            {"fields": {"estado_caso": "Design"}}, {"If-Match": '"0-0"'},
+        )
+        self.assertEqual(status, 404)
+
+    # ---- client ----
+
+    def test_client_goes_through_the_service(self):
+        data, etag = case_client.get_case(self.project_dir)
+        self.assertEqual(data["estado_caso"], "Nuevo")
+        new_etag = case_client.update_case(self.project_dir, {"estado_caso": "Design"}, etag)
+        self.assertEqual(new_etag, self.current_etag())
+        with self.assertRaises(CaseConflict):
+            case_client.update_case(self.project_dir, {"estado_caso": "Printing"}, etag)
+
+    def test_client_falls_back_to_direct_access(self):
+        case_client.SERVICE_PORT = _free_port()     # nothing listens there
+
+        data, etag = case_client.get_case(self.project_dir)
+        self.assertEqual(data["nombre_paciente"], "DOE^JOHN")
+        self.assertEqual(etag, self.current_etag())
+
+        new_etag = case_client.update_case(self.project_dir, {"estado_caso": "Design"}, etag, user="ana")
+        self.assertEqual(new_etag, self.current_etag())
+        self.assertEqual(list(iter_events(self.project_dir, "PEEK"))[-1]["user"], "ana")
+        with self.assertRaises(CaseConflict):
+            case_client.update_case(self.project_dir, {"estado_caso": "Printing"}, etag)
+        with self.assertRaises(CaseNotFound):
+            case_client.get_case(Path(self.clients_dir) / "C01" / "QA18-C01-PK9")
+        self.assertIsNone(case_client.list_projects())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
-from pathlib import Path
-from datetime import datetime, date, timedelta
-from utils import CLIENTS_DIR, load_json
+from datetime import datetime, date
+from case_index import refresh_index
+from business_calendar import make_calendar, business_days_left, due_dates
+from perf import span, timed
 
 # --------------------------------------------------
 # HELPERS
@@ -15,66 +16,69 @@ def parse_date(s):
         return None
 
 
-def business_days_left(deadline_date):
-    """
-    Count days until deadline, excluding Sundays.
-    """
-    if not deadline_date:
-        return None
-
-    today = date.today()
-    if deadline_date < today:
-        return 0
+def _ordinal(iso):
+    return date.fromisoformat(iso).toordinal() if iso else 0
 
-    days = 0
-    d = today
-    while d < deadline_date:
-        if d.weekday() != 6:  # Sunday
-            days += 1
-        d += timedelta(days=1)
 
-    return days
+# Rows are numbered from the bottom and sorted by urgency, so none can be
+# placed before the scan ends; while it runs only a counter is shown.
+def _print_scan_progress(n):
+    print(f"\rScanning cases... {n}", end="", flush=True)
 
 
 # --------------------------------------------------
-# MAIN
+# TABLE
 # --------------------------------------------------
 
-def show_timeline():
-    rows = []
-
-    for client_dir in Path(CLIENTS_DIR).iterdir():
-        if not client_dir.is_dir():
-            continue
-
-        for project_dir in client_dir.iterdir():
-            if not project_dir.is_dir():
-                continue
+TITLE = "==================== CASE TIMELINE ===================="
+RULE = "-" * 110
+HEADER = (
+    f"{'#':<3} {'CaseID':<15} {'Deadline':<10} {'Due':<10} "
+    f"{'ΔDays':<6} {'Surgery':<10} {'Region':<15} "
+    f"{'Cpx':<4} {'Stage':<20}"
+)
+
+
+def format_row(idx, r):
+    return (
+        f"{idx:<3} "
+        f"{r['project_id']:<15} "
+        f"{r['deadline']:<10} "
+        f"{r['due']:<10} "
+        f"{str(r['days_left']) if r['days_left'] is not None else '':<6} "
+        f"{r['surgery']:<10} "
+        f"{r['region']:<15} "
+        f"{r['complexity']:<4} "
+        f"{r['stage']:<20}"
+    )
 
-            peek_path = project_dir / "peekCase.json"
-            if not peek_path.exists():
-                continue
 
-            peek = load_json(peek_path, {})
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
 
-            deadline_date = parse_date(peek.get("fecha_entrega_estimada", ""))
-            dleft = business_days_left(deadline_date)
+@timed("timeline_rows")
+def timeline_rows(progress=None):
+    """
+    All indexed cases with days_left / due, in display order.
+    """
+    return decorate_rows(refresh_index(progress=progress))
 
-            rows.append({
-                "project_id": project_dir.name,
-                "request_date": peek.get("creado_en", "")[:10],
-                "deadline": peek.get("fecha_entrega_estimada", ""),
-                "days_left": dleft,
-                "surgery": peek.get("fecha_cirugia", ""),
-                "region": peek.get("region", ""),
-                "complexity": peek.get("complejidad", ""),
-                "stage": peek.get("estado_caso", ""),
-            })
 
-    if not rows:
-        print("\nNo active cases found.")
-        input("\nPress ENTER to return...")
-        return None
+def decorate_rows(rows):
+    """
+    Adds days_left / due to index rows and sorts them for display.
+    """
+    # one batched calendar pass for all rows
+    cal = make_calendar()
+    deadlines = [parse_date(r["deadline"]) for r in rows]
+    for r, dleft, due in zip(
+        rows,
+        business_days_left(deadlines, cal=cal),
+        due_dates(deadlines, cal=cal),
+    ):
+        r["days_left"] = dleft
+        r["due"] = due.isoformat() if due else ""
 
     # --------------------------------------------------
     # SORT (UNCHANGED – this is your stable logic)
@@ -83,40 +87,38 @@ def show_timeline():
         key=lambda r: (
             r["days_left"] is not None,                 # backlog first (None)
             -(r["days_left"] if r["days_left"] is not None else 0),  # urgent LAST
+            -_ordinal(r["due"]),                        # same ΔDays: earliest due LAST
             r["project_id"]
         )
     )
+    return rows
 
 
-    total = len(rows)
-
-    # --------------------------------------------------
-    # PRINT TABLE (NO HEADER AT TOP)
-    # --------------------------------------------------
-    print("\n==================== CASE TIMELINE ====================")
-
-    for i, r in enumerate(rows):
-        idx = total - i   # bottom row = 1
-        print(
-            f"{idx:<3} "
-            f"{r['project_id']:<15} "
-            f"{r['deadline']:<10} "
-            f"{str(r['days_left']) if r['days_left'] is not None else '':<6} "
-            f"{r['surgery']:<10} "
-            f"{r['region']:<15} "
-            f"{r['complexity']:<4} "
-            f"{r['stage']:<20}"
-        )
+def show_timeline():
+    with span("show_timeline") as info:     # timed up to the prompt
+        rows = timeline_rows(progress=_print_scan_progress)
+        print()
+        info["rows"] = total = len(rows)
+
+        if rows:
+            # --------------------------------------------------
+            # PRINT TABLE (NO HEADER AT TOP)
+            # --------------------------------------------------
+            print("\n" + TITLE)
+
+            for i, r in enumerate(rows):
+                print(format_row(total - i, r))   # bottom row = 1
+
+            # --------------------------------------------------
+            # HEADER AT BOTTOM (as requested)
+            # --------------------------------------------------
+            print(RULE)
+            print(HEADER)
 
-    # --------------------------------------------------
-    # HEADER AT BOTTOM (as requested)
-    # --------------------------------------------------
-    print("-" * 110)
-    print(
-        f"{'#':<3} {'CaseID':<15} {'Deadline':<10} "
-        f"{'ΔDays':<6} {'Surgery':<10} {'Region':<15} "
-        f"{'Cpx':<4} {'Stage':<20}"
-    )
+    if not rows:
+        print("\nNo active cases found.")
+        input("\nPress ENTER to return...")
+        return None
 
     # --------------------------------------------------
     # SELECTION
@@ -0,0 +1,293 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from case_index import refresh_index, update_cases
+from scanner import PEEK_CASE_FILENAME, iter_subdirs, scan_peek_cases
+from timeline import decorate_rows, format_row, TITLE, RULE, HEADER
+from utils import CLIENTS_DIR
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+
+DEBOUNCE = 0.5      # quiet time before redrawing after a burst of events
+MAX_DELAY = 2.0     # redraw at the latest this long after the first event
+POLL_INTERVAL = 3.0 # polling fallback (Windows, or inotify unavailable)
+
+# Watcher.wait() returns a set of changed project folders, or RESCAN when
+# the watcher lost track (queue overflow) and the whole tree must be synced.
+RESCAN = None
+
+# --------------------------------------------------
+# INOTIFY (Linux, via libc — no extra dependency)
+# --------------------------------------------------
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+
+DIR_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+FILE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_CREATE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    Watches clients/ (depth 0), each client folder (depth 1) and each
+    project folder (depth 2, for peekCase.json). New folders are picked up
+    as they appear.
+    """
+
+    def __init__(self, clients_dir=CLIENTS_DIR):
+        libc_name = ctypes.util.find_library("c")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.paths = {}     # wd -> (depth, path)
+        self._add(clients_dir, 0)
+        for client in iter_subdirs(clients_dir):
+            self._add(client.path, 1)
+            for project in iter_subdirs(client.path):
+                self._add(project.path, 2)
+
+    def _add(self, path, depth):
+        mask = DIR_EVENTS if depth < 2 else FILE_EVENTS
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            return  # vanished meanwhile, or watch limit: polling covers it next rescan
+        self.paths[wd] = (depth, path)
+
+    def _read(self):
+        changed = set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        pos = 0
+        while pos < len(buf):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, pos)
+            pos += EVENT_HEADER.size
+            name = buf[pos:pos + length].rstrip(b"\0").decode(errors="replace")
+            pos += length
+
+            if mask & IN_Q_OVERFLOW:
+                return RESCAN
+            if wd not in self.paths:
+                continue
+
+            depth, path = self.paths[wd]
+            full = os.path.join(path, name)
+
+            if depth == 0 and name.startswith("."):
+                continue    # clients/.staging and the like
+            if depth == 0 and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add(full, 1)
+                for project in iter_subdirs(full):
+                    self._add(project.path, 2)
+                    changed.add(project.path)
+            elif depth == 0 and mask & IN_ISDIR:
+                return RESCAN  # client folder removed / renamed
+            elif depth == 1 and mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add(full, 2)
+                changed.add(full)
+            elif depth == 2 and name == PEEK_CASE_FILENAME:
+                changed.add(path)
+
+        return changed
+
+    def wait(self, timeout):
+        """
+        Blocks until events arrive, then keeps collecting until DEBOUNCE
+        seconds pass without new events (or MAX_DELAY overall).
+        Returns set() on timeout.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        start = time.monotonic()
+        while True:
+            got = self._read()
+            if got is RESCAN:
+                return RESCAN
+            changed |= got
+            left = MAX_DELAY - (time.monotonic() - start)
+            if left <= 0:
+                break
+            ready, _, _ = select.select([self.fd], [], [], min(DEBOUNCE, left))
+            if not ready:
+                break
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+# --------------------------------------------------
+# POLLING FALLBACK
+# --------------------------------------------------
+
+class PollingWatcher:
+    """
+    Stats every peekCase.json each POLL_INTERVAL (parallel scanner) and
+    reports the projects whose (mtime, size) changed. Only those get
+    re-parsed.
+    """
+
+    def __init__(self, clients_dir=CLIENTS_DIR, interval=POLL_INTERVAL):
+        self.clients_dir = clients_dir
+        self.interval = interval
+        self.state = self._snapshot()
+
+    def _snapshot(self):
+        return {
+            os.path.dirname(peek_path): (st.st_mtime_ns, st.st_size)
+            for _c, _p, peek_path, st in scan_peek_cases(self.clients_dir)
+        }
+
+    def wait(self, timeout):
+        time.sleep(min(self.interval, timeout))
+        new = self._snapshot()
+        changed = {p for p in new.keys() | self.state.keys() if new.get(p) != self.state.get(p)}
+        self.state = new
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(clients_dir=CLIENTS_DIR):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(clients_dir)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(clients_dir)
+
+# --------------------------------------------------
+# SCREEN (ANSI; only changed lines are rewritten)
+# --------------------------------------------------
+
+FIRST_ROW_LINE = 2  # line 1 is the title
+FOOTER_LINES = 3    # rule, header, status
+
+
+def _render(rows):
+    total = len(rows)
+    return [format_row(total - i, r) for i, r in enumerate(rows)]
+
+
+def _screen_height():
+    try:
+        return os.get_terminal_size().lines
+    except OSError:
+        return 24   # not a terminal (redirected output)
+
+
+def _fit(lines, height):
+    """
+    Rows are placed at absolute positions: anything past the last screen
+    line would scroll the terminal and shift every later update. Keeps
+    what fits and ends with a "+N more" line.
+    """
+    room = max(height - FIRST_ROW_LINE + 1 - FOOTER_LINES, 1)
+    if len(lines) <= room:
+        return lines
+    shown = lines[:room - 1]
+    return shown + [f"  ... +{len(lines) - len(shown)} more"]
+
+
+def _write_line(lineno, text):
+    sys.stdout.write(f"\x1b[{lineno};1H{text}\x1b[K")
+
+
+def _footer(n_lines, status):
+    base = FIRST_ROW_LINE + n_lines
+    _write_line(base, RULE)
+    _write_line(base + 1, HEADER)
+    _write_line(base + 2, status)
+    sys.stdout.write("\x1b[J")
+
+
+def _full_redraw(lines, status):
+    sys.stdout.write("\x1b[2J")
+    _write_line(1, TITLE)
+    for i, line in enumerate(lines):
+        _write_line(FIRST_ROW_LINE + i, line)
+    _footer(len(lines), status)
+    sys.stdout.flush()
+
+
+def _partial_redraw(old, new, status):
+    """
+    Same row count: rewrite only lines whose text changed.
+    Returns how many lines were touched.
+    """
+    touched = 0
+    for i, (a, b) in enumerate(zip(old, new)):
+        if a != b:
+            _write_line(FIRST_ROW_LINE + i, b)
+            touched += 1
+    _footer(len(new), status)
+    sys.stdout.flush()
+    return touched
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+def watch_timeline(clients_dir=CLIENTS_DIR):
+    if os.name == "nt":
+        os.system("")  # enables ANSI escape handling in the Windows console
+
+    watcher = make_watcher(clients_dir)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+
+    height = _screen_height()
+    lines = _fit(_render(decorate_rows(refresh_index(clients_dir))), height)
+    _full_redraw(lines, f"[watch: {kind}] Ctrl+C to exit")
+
+    try:
+        while True:
+            changed = watcher.wait(timeout=60)
+            if changed is RESCAN:
+                rows = refresh_index(clients_dir)
+            elif changed:
+                rows = update_cases(changed)
+            else:
+                # timeout: days_left may have rolled over at midnight
+                rows = update_cases([])
+
+            new_height = _screen_height()
+            new = _fit(_render(decorate_rows(rows)), new_height)
+            status = f"[watch: {kind}] updated {time.strftime('%H:%M:%S')} | Ctrl+C to exit"
+
+            if len(new) == len(lines) and new_height == height:
+                _partial_redraw(lines, new, status)
+            else:
+                _full_redraw(new, status)
+            lines, height = new, new_height
+    except KeyboardInterrupt:
+        print()
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    watch_timeline()
@@ -0,0 +1,101 @@
+"""
+Benchmark: serial extractall vs archive_extract (serial stream and process
+pool) on synthetic DICOM studies of 500 to 3000 slices, as zip and as a
+multi-block 7z.
+
+Usage: python tools/bench_extract.py [--slices 500,1500,3000] [--size 256]
+                                     [--workers N] [--block 200]
+(--workers defaults to the automatic pool size; on a 1-core machine
+pass --workers 4 to exercise the pool anyway.)
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import synthetic  # noqa: E402
+from archive_extract import extract_archive, extract_workers  # noqa: E402
+
+
+def timed(fn, out_dir: Path):
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir()
+    t0 = time.perf_counter()
+    result = fn(out_dir)
+    return time.perf_counter() - t0, result
+
+
+def extractall_zip(archive):
+    def run(out):
+        with zipfile.ZipFile(archive) as z:
+            z.extractall(out)
+    return run
+
+
+def extractall_7z(archive):
+    def run(out):
+        import py7zr
+        with py7zr.SevenZipFile(archive) as z:
+            z.extractall(out)
+    return run
+
+
+def ours(archive, workers):
+    def run(out):
+        with contextlib.redirect_stdout(io.StringIO()):     # no summary lines
+            return extract_archive(archive, out, show_progress=False, workers=workers)
+    return run
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--slices", default="500,1500,3000")
+    ap.add_argument("--size", type=int, default=256, help="slice rows / columns")
+    ap.add_argument("--workers", type=int, help="pool size (default: automatic)")
+    ap.add_argument("--block", type=int, default=200, help="files per 7z solid block")
+    args = ap.parse_args()
+
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'archive':<18} {'MB':>7} {'extractall':>11} {'stream':>9} {'pool':>9} {'workers':>8} {'speedup':>8}")
+    print("-" * 76)
+
+    for n in (int(x) for x in args.slices.split(",")):
+        with tempfile.TemporaryDirectory(prefix="datsys-extract-") as tmp:
+            tmp = Path(tmp)
+            study = synthetic.write_dicom_study(tmp / "study", n, args.size, args.size)
+            archives = {
+                "zip": (synthetic.pack_zip(study, tmp / "s.zip"), extractall_zip),
+                "7z": (synthetic.pack_7z(study, tmp / "s.7z", files_per_block=args.block), extractall_7z),
+            }
+            shutil.rmtree(study)
+
+            for kind, (archive, baseline) in archives.items():
+                if archive is None:
+                    print(f"{n:>5} slices {kind:<5} skipped (py7zr not installed)")
+                    continue
+
+                # output size ~ the uncompressed study
+                with zipfile.ZipFile(archives["zip"][0]) as z:
+                    mb = sum(i.file_size for i in z.infolist()) / 1e6
+                workers = args.workers or extract_workers(mb * 1e6, n)
+
+                t_all, _ = timed(baseline(archive), tmp / "out")
+                t_stream, _ = timed(ours(archive, 1), tmp / "out")
+                t_pool, stats = timed(ours(archive, workers), tmp / "out")
+                print(
+                    f"{n:>5} slices {kind:<5} {mb:>7.0f} {t_all:>10.2f}s {t_stream:>8.2f}s "
+                    f"{t_pool:>8.2f}s {stats['workers']:>8} {t_all / t_pool:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
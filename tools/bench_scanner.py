@@ -0,0 +1,131 @@
+"""
+Benchmark: serial Path walk vs scanner.py on a synthetic clients/ tree
+with simulated per-call network latency (SMB round trip).
+
+Usage: python tools/bench_scanner.py [clients] [projects_per_client] [latency_ms]
+"""
+import builtins
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scanner import scan_peek_cases, stream_map  # noqa: E402
+from utils import load_json  # noqa: E402
+
+# --------------------------------------------------
+# SYNTHETIC TREE
+# --------------------------------------------------
+
+def build_tree(root: Path, n_clients: int, n_projects: int):
+    for c in range(n_clients):
+        client_id = f"C{c:02d}"
+        client_dir = root / client_id
+        client_dir.mkdir(parents=True)
+        (client_dir / f"client_{client_id}.json").write_text("{}", encoding="utf-8")
+
+        for p in range(n_projects):
+            project_dir = client_dir / f"Q113-{client_id}-PK{p + 1}"
+            project_dir.mkdir()
+            (project_dir / "peekCase.json").write_text(json.dumps({
+                "id_caso": project_dir.name,
+                "fecha_entrega_estimada": "2026-12-01",
+                "estado_caso": "Design",
+            }), encoding="utf-8")
+
+# --------------------------------------------------
+# LATENCY INJECTION
+# --------------------------------------------------
+
+def with_latency(fn, seconds):
+    def wrapped(*args, **kwargs):
+        time.sleep(seconds)
+        return fn(*args, **kwargs)
+    return wrapped
+
+
+def patch_latency(seconds):
+    originals = (os.stat, os.scandir, os.listdir, builtins.open)
+    os.stat = with_latency(os.stat, seconds)
+    os.scandir = with_latency(os.scandir, seconds)
+    os.listdir = with_latency(os.listdir, seconds)
+    builtins.open = with_latency(builtins.open, seconds)
+    return originals
+
+
+def restore(originals):
+    os.stat, os.scandir, os.listdir, builtins.open = originals
+
+# --------------------------------------------------
+# CANDIDATES
+# --------------------------------------------------
+
+def serial_walk(root: Path):
+    """The pre-scanner timeline loop."""
+    rows = 0
+    for client_dir in root.iterdir():
+        if not client_dir.is_dir():
+            continue
+        for project_dir in client_dir.iterdir():
+            if not project_dir.is_dir():
+                continue
+            peek_path = project_dir / "peekCase.json"
+            if not peek_path.exists():
+                continue
+            load_json(peek_path, {})
+            rows += 1
+    return rows
+
+
+def scanner_walk(root: Path):
+    def read(item):
+        return load_json(item[2], {})
+
+    first = None
+    rows = 0
+    t0 = time.perf_counter()
+    for _ in stream_map(read, scan_peek_cases(str(root))):
+        if first is None:
+            first = time.perf_counter() - t0
+        rows += 1
+    return rows, first
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+def main():
+    n_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    n_projects = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "clients"
+        build_tree(root, n_clients, n_projects)
+
+        originals = patch_latency(latency_ms / 1000)
+        try:
+            t0 = time.perf_counter()
+            n_serial = serial_walk(root)
+            t_serial = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            n_scan, first = scanner_walk(root)
+            t_scan = time.perf_counter() - t0
+        finally:
+            restore(originals)
+
+    assert n_serial == n_scan, (n_serial, n_scan)
+
+    print(f"tree:     {n_clients} clients x {n_projects} projects, {latency_ms} ms/call")
+    print(f"serial:   {t_serial:.3f}s ({n_serial} cases)")
+    print(f"scanner:  {t_scan:.3f}s ({n_scan} cases, first row after {first:.3f}s)")
+    print(f"speedup:  {t_serial / t_scan:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
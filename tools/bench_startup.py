@@ -0,0 +1,73 @@
+"""
+Startup benchmark for datsys.py, based on `python -X importtime`.
+
+Fails (exit 1) if importing datsys takes longer than the threshold, or if
+any heavy library is pulled in before the first menu is shown.
+
+Usage: python tools/bench_startup.py [threshold_ms] [runs]
+"""
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+THRESHOLD_MS = 120
+RUNS = 5
+
+# Only the operations that need these may import them.
+HEAVY_MODULES = ("pydicom", "py7zr", "rarfile", "numpy")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile():
+    """
+    Returns {module: cumulative_us} for one cold `import datsys`.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import datsys"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    out = {}
+    for line in proc.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            out[m.group(4)] = int(m.group(2))
+    return out
+
+
+def main():
+    threshold = float(sys.argv[1]) if len(sys.argv) > 1 else THRESHOLD_MS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else RUNS
+
+    profiles = [import_profile() for _ in range(runs)]
+    best_ms = min(p["datsys"] for p in profiles) / 1000
+    heavy = sorted({m for p in profiles for m in p if m.split(".")[0] in HEAVY_MODULES})
+
+    slowest = sorted(profiles[0].items(), key=lambda kv: kv[1], reverse=True)[:8]
+    print("slowest imports (cumulative):")
+    for name, us in slowest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    print(f"\nimport datsys: {best_ms:.1f} ms (best of {runs}, threshold {threshold:.0f} ms)")
+
+    failed = False
+    if heavy:
+        print(f"[FAIL] heavy modules imported at startup: {', '.join(heavy[:10])}")
+        failed = True
+    if best_ms > threshold:
+        print("[FAIL] startup regression")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+    print("[OK]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Benchmark suite on synthetic data (see tools/synthetic.py). Everything runs
+in a temp folder: DATSYS_CLIENTS_DIR / DATSYS_DATA_DIR point there, so the
+real clients/ tree and index are never touched.
+
+Timed: show_timeline (cold / warm index), ingest_dicom (folder, zip, 7z;
+non-interactive), contains_dicom, build_manifest, extract_patient_name
+(manifest read), list_dirs, make_snapshot_zip.
+
+Usage:
+  python tools/bench_suite.py [--clients 20] [--projects 25] [--slices 120]
+                              [--size 256] [--repeat 5]
+                              [--out results.json] [--compare baseline.json]
+
+--out writes machine-readable results (commit, params, every run).
+--compare prints the change per benchmark against an earlier --out file and
+exits 1 if any median got slower than --threshold (default 10%) by at
+least --min-delta seconds.
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=REPO_DIR, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Swallows prints and answers every input() with ENTER.
+    """
+    real_input = builtins.input
+    builtins.input = lambda *a, **k: ""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = real_input
+
+
+def measure(fn, repeat, setup=None):
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        with quiet():
+            fn()
+        runs.append(time.perf_counter() - t0)
+    return {
+        "runs": [round(r, 6) for r in runs],
+        "median": round(statistics.median(runs), 6),
+        "min": round(min(runs), 6),
+        "unit": "s",
+    }
+
+# --------------------------------------------------
+# SUITE
+# --------------------------------------------------
+
+def run_suite(tmp: Path, args):
+    # tmp/root = a DATSYS root (clients/, data/), tmp/inputs = DICOM sources
+    root = tmp / "root"
+    inputs_dir = tmp / "inputs"
+
+    # must happen before the first import of utils (paths are read at import)
+    os.environ["DATSYS_CLIENTS_DIR"] = str(root / "clients")
+    os.environ["DATSYS_DATA_DIR"] = str(root / "data")
+    sys.path.insert(0, str(REPO_DIR))
+
+    import synthetic
+
+    print("building fixtures...", file=sys.stderr)
+    projects = synthetic.build_clients_tree(root / "clients", args.clients, args.projects)
+    study = synthetic.write_dicom_study(inputs_dir / "study", args.slices, args.size, args.size)
+    inputs = {
+        "folder": study,
+        "zip": synthetic.pack_zip(study, inputs_dir / "study.zip"),
+        "7z": synthetic.pack_7z(study, inputs_dir / "study.7z"),
+    }
+
+    # manifests are written next to the files: work on a copy of the study
+    scan = inputs_dir / "scan"
+    shutil.copytree(study, scan)
+
+    import snapshot_zip
+    from case_index import INDEX_PATH
+    from dicom_ingestion import contains_dicom, extract_patient_name, ingest_dicom
+    from dicom_manifest import build_manifest
+    from timeline import show_timeline
+    from utils import CLIENTS_DIR, list_dirs
+
+    results = {}
+
+    def bench(name, fn, setup=None):
+        print(f"  {name}", file=sys.stderr)
+        results[name] = measure(fn, args.repeat, setup)
+
+    def drop_index():
+        if os.path.exists(INDEX_PATH):
+            os.remove(INDEX_PATH)
+
+    bench("list_dirs", lambda: [list_dirs(os.path.join(CLIENTS_DIR, c)) for c in list_dirs(CLIENTS_DIR)])
+    bench("show_timeline.cold", show_timeline, setup=drop_index)
+    bench("show_timeline.warm", show_timeline)
+    bench("contains_dicom", lambda: contains_dicom(study))
+    bench("build_manifest", lambda: build_manifest(scan))
+    bench("extract_patient_name", lambda: extract_patient_name(scan))
+
+    target = projects[0]
+    for kind, source in inputs.items():
+        if source is None:
+            print(f"  ingest_dicom.{kind}: skipped (py7zr not installed)", file=sys.stderr)
+            continue
+        bench(f"ingest_dicom.{kind}", lambda s=source: ingest_dicom(target, source=s, replace=True))
+
+    # snapshot the synthetic root, written outside it
+    snapshot_zip.PROJECT_ROOT = root
+    snapshot_zip.OUTPUT_ZIP = tmp / "snapshot.zip"
+    bench("make_snapshot_zip", snapshot_zip.make_snapshot_zip)
+
+    return results
+
+# --------------------------------------------------
+# REPORT
+# --------------------------------------------------
+
+def print_results(results):
+    print(f"{'benchmark':<24} {'median s':>10} {'min s':>10}")
+    print("-" * 46)
+    for name, r in results.items():
+        print(f"{name:<24} {r['median']:>10.4f} {r['min']:>10.4f}")
+
+
+def compare(results, baseline_path, threshold, min_delta):
+    """
+    Returns the names that regressed past threshold. Differences under
+    min_delta seconds are noise on sub-millisecond benchmarks and ignored.
+    """
+    base = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    print(f"\nvs {baseline_path} ({base['meta'].get('commit')}):")
+    print(f"{'benchmark':<24} {'before':>10} {'after':>10} {'change':>8}")
+    print("-" * 56)
+
+    if base["meta"].get("params") != results["meta"]["params"]:
+        print("[WARN] fixture parameters differ, numbers are not comparable")
+
+    slower = []
+    for name, r in results["results"].items():
+        old = base["results"].get(name)
+        if not old:
+            print(f"{name:<24} {'-':>10} {r['median']:>10.4f} {'new':>8}")
+            continue
+        change = r["median"] / old["median"] - 1 if old["median"] else 0.0
+        significant = abs(r["median"] - old["median"]) >= min_delta
+        flag = ""
+        if significant and change > threshold:
+            flag = "  SLOWER"
+            slower.append(name)
+        elif significant and change < -threshold:
+            flag = "  faster"
+        print(f"{name:<24} {old['median']:>10.4f} {r['median']:>10.4f} {change:>+7.0%}{flag}")
+    return slower
+
+# --------------------------------------------------
+# MAIN
+# --------------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="DATSYS synthetic benchmark suite")
+    ap.add_argument("--clients", type=int, default=20)
+    ap.add_argument("--projects", type=int, default=25, help="projects per client")
+    ap.add_argument("--slices", type=int, default=120, help="slices in the main CT series")
+    ap.add_argument("--size", type=int, default=256, help="slice rows / columns")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", metavar="BASELINE", help="results JSON from an earlier run")
+    ap.add_argument("--threshold", type=float, default=0.10, help="relative change to flag")
+    ap.add_argument("--min-delta", type=float, default=0.002, help="seconds; smaller changes are noise")
+    args = ap.parse_args()
+
+    params = {k: getattr(args, k) for k in ("clients", "projects", "slices", "size", "repeat")}
+
+    with tempfile.TemporaryDirectory(prefix="datsys-bench-") as tmp:
+        bench_results = run_suite(Path(tmp), args)
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": params,
+        },
+        "results": bench_results,
+    }
+
+    print_results(bench_results)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n[OK] Results written: {args.out}")
+
+    if args.compare:
+        slower = compare(results, args.compare, args.threshold, args.min_delta)
+        if slower:
+            print(f"\n[FAIL] slower than baseline: {', '.join(slower)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
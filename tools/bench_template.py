@@ -0,0 +1,85 @@
+"""
+Benchmark: shutil.copytree vs template_materializer on a synthetic PEEK
+template (default 500 MB: a 150 MB PEEK.blend plus read-only assets).
+
+Usage: python tools/bench_template.py [size_mb] [work_dir]
+(work_dir defaults to a temp folder; point it at the share to measure SMB.)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from template_materializer import materialize_template  # noqa: E402
+
+CHUNK = 1024 * 1024
+
+
+def write_file(path: Path, size_mb: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    block = os.urandom(CHUNK)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def build_template(root: Path, size_mb: int):
+    blend_mb = max(1, size_mb * 3 // 10)
+    write_file(root / "Blender" / "PEEK.blend", blend_mb)
+
+    asset_mb = size_mb - blend_mb
+    n_assets = max(1, asset_mb // 10)
+    for i in range(n_assets):
+        write_file(root / "Assets" / f"asset_{i:02d}.stl", asset_mb // n_assets)
+
+    (root / "DICOM").mkdir()
+    (root / "DICOM" / ".gitkeep").touch()
+    (root / "peekCase.json").write_text("{}", encoding="utf-8")
+    (root / "Log.jsonl").touch()
+
+
+def dir_bytes(root: Path):
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    work = Path(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    with tempfile.TemporaryDirectory(dir=work) as tmp:
+        tmp = Path(tmp)
+        template = tmp / "template"
+        build_template(template, size_mb)
+        total = dir_bytes(template)
+
+        t0 = time.perf_counter()
+        shutil.copytree(template, tmp / "copytree")
+        t_copy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        manifest = materialize_template(
+            template,
+            tmp / "materialized",
+            renames={"Blender/PEEK.blend": "Blender/BENCH-PK1.blend"},
+        )
+        t_mat = time.perf_counter() - t0
+
+        # bytes that really got new data blocks (reflinks / hardlinks share)
+        written = sum(
+            (tmp / "materialized" / rel).stat().st_size
+            for rel, mode in manifest["files"].items()
+            if mode == "copy"
+        )
+
+    print(f"template:     {total / CHUNK:.0f} MB")
+    print(f"copytree:     {t_copy:.3f}s")
+    print(f"materialize:  {t_mat:.3f}s  {manifest['counts']}, {written / CHUNK:.0f} MB written")
+    print(f"speedup:      {t_copy / t_mat:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import slicer
 from DICOMLib import DICOMUtils
 
@@ -9,14 +10,51 @@ def score_name(name: str) -> int:
     n = name.lower()
     return sum(1 for k in KEYWORDS if k in n)
 
-def main():
-    if len(sys.argv) < 2:
-        raise RuntimeError("Usage: slicer_autoload_volume.py <DICOM_FOLDER>")
-
-    dicom_dir = sys.argv[-1]
-    if not os.path.isdir(dicom_dir):
-        raise RuntimeError(f"DICOM folder not found: {dicom_dir}")
-
+def parse_args():
+    """
+    <DICOM_FOLDER> [SERIES_UID]. A UID is never a folder, so the folder
+    is whichever of the last two arguments exists.
+    """
+    if len(sys.argv) >= 3 and os.path.isdir(sys.argv[-2]):
+        return sys.argv[-2], sys.argv[-1]
+    if len(sys.argv) >= 2 and os.path.isdir(sys.argv[-1]):
+        return sys.argv[-1], None
+    raise RuntimeError("Usage: slicer_autoload_volume.py <DICOM_FOLDER> [SERIES_UID]")
+
+
+def series_paths(dicom_dir, series_uid):
+    """
+    Files of one series from DATSYS' DICOM/manifest.json (no rescan).
+    """
+    manifest_path = os.path.join(dicom_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return []
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return [
+        os.path.join(dicom_dir, *e["path"].split("/"))
+        for e in manifest.get("files", [])
+        if e.get("SeriesInstanceUID") == series_uid
+    ]
+
+
+def load_series(files):
+    """
+    One scalar volume straight from the files, no DICOM database.
+    """
+    plugin = slicer.modules.dicomPlugins["DICOMScalarVolumePlugin"]()
+    loadables = plugin.examineFiles(files)
+    if not loadables:
+        return None
+    loadables.sort(key=lambda l: (l.selected, l.confidence), reverse=True)
+    return plugin.load(loadables[0])
+
+
+def load_all(dicom_dir):
+    """
+    Old path (no manifest / no series given): import everything, load the
+    patient and pick a volume by name.
+    """
     print(f"[SLICER] Importing DICOM from: {dicom_dir}")
 
     # --- TEMPORARY DICOM DB ---
@@ -43,7 +81,19 @@ def main():
     # --- PICK BEST VOLUME ---
     scored = [(score_name(v.GetName()), v) for v in volumes]
     scored.sort(key=lambda x: x[0], reverse=True)
-    best_volume = scored[0][1]
+    return scored[0][1]
+
+
+def main():
+    dicom_dir, series_uid = parse_args()
+
+    best_volume = None
+    files = series_paths(dicom_dir, series_uid) if series_uid else []
+    if files:
+        print(f"[SLICER] Loading series {series_uid} ({len(files)} files)")
+        best_volume = load_series(files)
+    if best_volume is None:
+        best_volume = load_all(dicom_dir)
 
     print(f"[SLICER] Selected volume: {best_volume.GetName()}")
 
@@ -0,0 +1,55 @@
+"""
+Stress test: many processes allocating project numbers for one client at once.
+Fails loudly if any suffix is handed out twice or skipped.
+
+Usage: python tools/stress_allocator.py [processes] [allocations_per_process] [clients_dir]
+(clients_dir defaults to a temp folder; point it at the share to test SMB.)
+"""
+import sys
+import tempfile
+from multiprocessing import Pool
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from project_allocator import allocate_suffix, reserve_suffixes  # noqa: E402
+from utils import load_json, save_json  # noqa: E402
+
+CLIENT_ID = "STRESS"
+BULK = 5
+
+
+def worker(args):
+    clients_dir, n = args
+    got = [allocate_suffix(CLIENT_ID, clients_dir) for _ in range(n)]
+    got += reserve_suffixes(CLIENT_ID, BULK, clients_dir)
+    return got
+
+
+def main():
+    procs = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    per_proc = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clients_dir = sys.argv[3] if len(sys.argv) > 3 else tmp
+        client_json = Path(clients_dir) / CLIENT_ID / f"client_{CLIENT_ID}.json"
+        save_json(client_json, {"id": CLIENT_ID, "project_count": 0})
+
+        with Pool(procs) as pool:
+            results = pool.map(worker, [(clients_dir, per_proc)] * procs)
+
+        final = load_json(client_json)["project_count"]
+
+    all_ids = sorted(s for r in results for s in r)
+    expected = procs * (per_proc + BULK)
+
+    dupes = len(all_ids) - len(set(all_ids))
+    if dupes or all_ids != list(range(1, expected + 1)) or final != expected:
+        print(f"[FAIL] {len(all_ids)} ids, {dupes} duplicates, project_count={final}, expected {expected}")
+        sys.exit(1)
+
+    print(f"[OK] {procs} processes, {expected} unique suffixes, project_count={final}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Synthetic fixtures for the benchmarks: a clients/ tree with realistic
+peekCase.json and Log.jsonl files, and DICOM studies written with pydicom
+(CD-export layout, extensionless files, a localizer series next to the
+main CT series, and some non-DICOM clutter).
+
+Nothing here touches the real clients/ folder; every builder takes the
+root to write into.
+"""
+import json
+import random
+import zipfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+STAGES = ("NEW", "Segmentation", "Design", "Review", "Printing", "Delivered")
+REGIONS = ("Cráneo", "Mandíbula", "Órbita", "Cigomático", "Maxilar")
+EVENTS = ("STAGE", "LOG", "PEEK", "INGEST", "EXPORT")
+USERS = ("lucas", "maria", "javier")
+
+# --------------------------------------------------
+# CLIENTS TREE
+# --------------------------------------------------
+
+def make_peek_case(project_id, client_name, rng, today=None):
+    today = today or date.today()
+    created = today - timedelta(days=rng.randint(0, 60))
+    deadline = today + timedelta(days=rng.randint(-10, 45))
+    return {
+        "id_caso": project_id,
+        "nombre_paciente": f"PACIENTE^{rng.randint(1000, 9999)}",
+        "nombre_doctor": client_name,
+        "hospital_clinica": f"Clínica {rng.randint(1, 40)}",
+        "fecha_cirugia": (deadline + timedelta(days=rng.randint(1, 10))).isoformat(),
+        "hora_cirugia": f"{rng.randint(8, 18):02d}:00",
+        "region": rng.choice(REGIONS),
+        "especificaciones": "Implante PEEK a medida, " * rng.randint(1, 4),
+        "requiere_material_adicional": "",
+        "precio_clp": rng.randint(8, 40) * 100000,
+        "iva_incluido": True,
+        "fecha_entrega_estimada": deadline.isoformat(),
+        "estado_caso": rng.choice(STAGES),
+        "complejidad": rng.choice(("Baja", "Media", "Alta")),
+        "notas": "",
+        "link_dicom": "",
+        "creado_en": datetime.combine(created, datetime.min.time()).isoformat(),
+        "actualizado_en": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def make_log(path, n_events, rng):
+    ts = datetime.now() - timedelta(days=60)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for _ in range(n_events):
+            ts += timedelta(minutes=rng.randint(5, 600))
+            event = rng.choice(EVENTS)
+            f.write(json.dumps({
+                "ts": ts.isoformat(timespec="seconds"),
+                "event": event,
+                "stage": rng.choice(STAGES) if event == "STAGE" else "",
+                "user": rng.choice(USERS),
+                "source": rng.choice(("datsys", "blender")),
+                "msg": f"{event.lower()} entry",
+            }, ensure_ascii=False) + "\n")
+
+
+def build_clients_tree(root, n_clients=20, n_projects=25, log_events=40, seed=0):
+    """
+    root/<CLIENT>/client_<CLIENT>.json + root/<CLIENT>/<PROJECT>/{peekCase.json,
+    Log.jsonl, DICOM/, Blender/}. Returns the list of project folders.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    projects = []
+
+    for c in range(n_clients):
+        client_id = f"C{c:02d}"
+        client_dir = root / client_id
+        client_dir.mkdir(parents=True)
+        name = f"Dr. Sintético {c}"
+        (client_dir / f"client_{client_id}.json").write_text(json.dumps({
+            "id": client_id,
+            "name": name,
+            "contact": "",
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "project_count": n_projects,
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        for p in range(n_projects):
+            project_id = f"QA17-{client_id}-PK{p + 1}"
+            project_dir = client_dir / project_id
+            (project_dir / "DICOM").mkdir(parents=True)
+            (project_dir / "Blender").mkdir()
+            (project_dir / "peekCase.json").write_text(json.dumps(
+                make_peek_case(project_id, name, rng), indent=2, ensure_ascii=False
+            ), encoding="utf-8")
+            make_log(project_dir / "Log.jsonl", log_events, rng)
+            projects.append(project_dir)
+
+    return projects
+
+# --------------------------------------------------
+# DICOM
+# --------------------------------------------------
+
+def _pixels(rows, cols, z, rng):
+    # smooth body-like gradient plus noise: compresses roughly like real CT
+    import numpy as np
+    y, x = np.mgrid[0:rows, 0:cols]
+    r = np.hypot(y - rows / 2, x - cols / 2)
+    img = np.where(r < min(rows, cols) * 0.4, 1000 + (z % 50) * 4, 0).astype(np.int32)
+    img += rng.integers(0, 64, size=(rows, cols), dtype=np.int32)
+    return img.astype(np.uint16)
+
+
+def write_dicom_series(out_dir, n_slices, patient_name="SINTETICO^PACIENTE",
+                       study_uid=None, rows=256, cols=256, modality="CT",
+                       description="AXIAL 1.0", series_number=2, seed=0,
+                       name_fmt="I{:04d}"):
+    """
+    One series, one file per slice. Returns (series_uid, [paths]).
+    """
+    import numpy as np
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import CTImageStorage, ExplicitVRLittleEndian, generate_uid
+
+    rng = np.random.default_rng(seed)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    study_uid = study_uid or generate_uid()
+    series_uid = generate_uid()
+    paths = []
+
+    for i in range(n_slices):
+        meta = FileMetaDataset()
+        meta.MediaStorageSOPClassUID = CTImageStorage
+        meta.MediaStorageSOPInstanceUID = generate_uid()
+        meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+        ds = Dataset()
+        ds.file_meta = meta
+        ds.SOPClassUID = CTImageStorage
+        ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+        ds.PatientName = patient_name
+        ds.PatientID = "SYN0001"
+        ds.StudyInstanceUID = study_uid
+        ds.SeriesInstanceUID = series_uid
+        ds.SeriesNumber = series_number
+        ds.SeriesDescription = description
+        ds.Modality = modality
+        ds.InstanceNumber = i + 1
+        ds.SliceThickness = 1.0
+        ds.PixelSpacing = [0.5, 0.5]
+        ds.ImagePositionPatient = [0.0, 0.0, float(i)]
+        ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+        ds.Rows = rows
+        ds.Columns = cols
+        ds.SamplesPerPixel = 1
+        ds.PhotometricInterpretation = "MONOCHROME2"
+        ds.BitsAllocated = 16
+        ds.BitsStored = 16
+        ds.HighBit = 15
+        ds.PixelRepresentation = 0
+        ds.PixelData = _pixels(rows, cols, i, rng).tobytes()
+
+        path = out_dir / name_fmt.format(i + 1)
+        try:
+            ds.save_as(path, enforce_file_format=True)    # pydicom >= 3
+        except TypeError:
+            ds.is_little_endian = True
+            ds.is_implicit_VR = False
+            ds.save_as(path, write_like_original=False)
+        paths.append(path)
+
+    return series_uid, paths
+
+
+def write_dicom_study(out_dir, n_slices, rows=256, cols=256, seed=0):
+    """
+    CD-export layout:
+      DICOM/S0001/I0001..  3-slice localizer
+      DICOM/S0002/I0001..  main CT series (n_slices)
+      README.TXT, AUTORUN.INF, VIEWER/viewer.dat
+    """
+    from pydicom.uid import generate_uid
+
+    out_dir = Path(out_dir)
+    study_uid = generate_uid()
+    write_dicom_series(out_dir / "DICOM" / "S0001", 3, study_uid=study_uid,
+                       rows=rows, cols=cols, description="SCOUT",
+                       series_number=1, seed=seed)
+    write_dicom_series(out_dir / "DICOM" / "S0002", n_slices, study_uid=study_uid,
+                       rows=rows, cols=cols, seed=seed + 1)
+
+    (out_dir / "README.TXT").write_text("Exported by Synthetic PACS\n", encoding="utf-8")
+    (out_dir / "AUTORUN.INF").write_text("[autorun]\nopen=VIEWER\\viewer.exe\n", encoding="utf-8")
+    (out_dir / "VIEWER").mkdir()
+    (out_dir / "VIEWER" / "viewer.dat").write_bytes(random.Random(seed).randbytes(256 * 1024))
+    return out_dir
+
+# --------------------------------------------------
+# PACKING
+# --------------------------------------------------
+
+def pack_zip(folder, archive):
+    folder = Path(folder)
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        for p in sorted(folder.rglob("*")):
+            if p.is_file():
+                z.write(p, p.relative_to(folder).as_posix())
+    return Path(archive)
+
+
+def pack_7z(folder, archive, files_per_block=None):
+    """
+    Solid 7z by default; files_per_block splits it into several solid
+    blocks (like 7-Zip's solid block size limit). None if py7zr is not
+    installed.
+    """
+    try:
+        import py7zr
+    except ImportError:
+        return None
+    folder = Path(folder)
+    files = [p for p in sorted(folder.rglob("*")) if p.is_file()]
+    step = files_per_block or len(files) or 1
+
+    for start in range(0, len(files), step):
+        # every append session becomes its own block
+        with py7zr.SevenZipFile(archive, "w" if start == 0 else "a") as z:
+            for p in files[start:start + step]:
+                z.write(p, p.relative_to(folder).as_posix())
+    return Path(archive)
@@ -1,6 +1,10 @@
 import os
+import copy
 import json
-from pathlib import Path
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 # -------------------------
@@ -8,8 +12,15 @@ from datetime import datetime
 # -------------------------
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CLIENTS_DIR = os.path.join(BASE_DIR, "clients")
-DATA_DIR = os.path.join(BASE_DIR, "data")
+
+# Overridable so benchmarks / staging can run against another tree
+# (must be set before the first import of utils)
+CLIENTS_DIR = os.environ.get("DATSYS_CLIENTS_DIR") or os.path.join(BASE_DIR, "clients")
+DATA_DIR = os.environ.get("DATSYS_DATA_DIR") or os.path.join(BASE_DIR, "data")
+
+# none = rely on the OS, file = fsync the file before replace,
+# full = also fsync the parent folder (POSIX only)
+FSYNC_POLICY = os.environ.get("DATSYS_FSYNC", "file")
 
 # -------------------------
 # FS HELPERS
@@ -19,24 +30,129 @@ def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
 def list_dirs(path):
+    # scandir reports entry types with the listing: one round trip, not one per entry
+    # hidden folders (clients/.staging) are not clients / projects
     if not os.path.exists(path):
         return []
-    return [d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d))]
+    with os.scandir(path) as it:
+        return [e.name for e in it if e.is_dir() and not e.name.startswith(".")]
 
 # -------------------------
 # JSON HELPERS
 # -------------------------
 
+# In-process LRU: path -> ((st_mtime_ns, st_size, st_ino), data).
+# Any change on disk (including by Blender) changes the stat key and forces
+# a re-read. Callers always get a deep copy they can mutate freely.
+JSON_CACHE_SIZE = 256
+
+# SMB / FAT mtimes can be as coarse as 2 s: two same-size writes inside one
+# tick keep the same key. Files modified this recently are never cached.
+MTIME_GRANULARITY_NS = 2_000_000_000
+
+_json_cache = OrderedDict()
+_json_cache_lock = threading.Lock()
+_json_stats = {"hits": 0, "misses": 0}
+
+def _stat_key(st):
+    # st_ino changes on every os.replace (0 where the share doesn't report it)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+def _cache_put(key, stat_key, data):
+    if time.time_ns() - stat_key[0] < MTIME_GRANULARITY_NS:
+        with _json_cache_lock:
+            _json_cache.pop(key, None)
+        return
+    with _json_cache_lock:
+        _json_cache[key] = (stat_key, copy.deepcopy(data))
+        _json_cache.move_to_end(key)
+        while len(_json_cache) > JSON_CACHE_SIZE:
+            _json_cache.popitem(last=False)
+
+def json_cache_stats():
+    with _json_cache_lock:
+        return dict(_json_stats, size=len(_json_cache))
+
+def clear_json_cache():
+    with _json_cache_lock:
+        _json_cache.clear()
+        _json_stats["hits"] = _json_stats["misses"] = 0
+
 def load_json(path, default=None):
-    if not os.path.exists(path):
+    key = os.path.abspath(path)
+    try:
+        st = os.stat(key)
+    except FileNotFoundError:
+        with _json_cache_lock:
+            _json_cache.pop(key, None)
         return default
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
 
-def save_json(path, data):
-    ensure_dir(os.path.dirname(path))
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    with _json_cache_lock:
+        hit = _json_cache.get(key)
+        if hit and hit[0] == _stat_key(st):
+            _json_cache.move_to_end(key)
+            _json_stats["hits"] += 1
+            return copy.deepcopy(hit[1])
+        _json_stats["misses"] += 1
+
+    with open(key, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    _cache_put(key, _stat_key(st), data)
+    return data
+
+# mkstemp creates 0600; new files get what a plain open() would.
+# Read once: os.umask() can only be read by setting it, which isn't thread-safe.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def atomic_write_text(path, text, fsync=None):
+    """
+    Write to a temp file in the same folder, then os.replace() it over path.
+    A crash leaves either the old file or the new one, never half of it.
+    Returns the stat of the written file.
+    """
+    policy = fsync or FSYNC_POLICY
+    folder = os.path.dirname(os.path.abspath(path))
+    ensure_dir(folder)
+
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=".part")
+    try:
+        if os.name != "nt":
+            try:
+                mode = os.stat(path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o666 & ~_UMASK
+            os.chmod(tmp, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            if policy != "none":
+                os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    if policy == "full" and os.name != "nt":
+        dir_fd = os.open(folder, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    return st
+
+def save_json(path, data, fsync=None):
+    st = atomic_write_text(
+        path,
+        json.dumps(data, indent=2, ensure_ascii=False),
+        fsync,
+    )
+    # write-through; skipped while the mtime is within MTIME_GRANULARITY_NS
+    _cache_put(os.path.abspath(path), _stat_key(st), data)
 
 # -------------------------
 # TIME
@@ -72,25 +188,3 @@ def date_code_base36(dt=None):
     d = f"{dt.day:02d}"         # always 2 digits
 
     return f"{y}{m}{d}"
-
-def update_stage(project_dir, stage, message=None):
-    project_dir = Path(project_dir)
-
-    # ---- update peekCase.json ----
-    peek_path = project_dir / "peekCase.json"
-    data = load_json(peek_path, {})
-    data["estado_caso"] = stage
-    data["actualizado_en"] = now_iso()
-    save_json(peek_path, data)
-
-    # ---- append log ----
-    log_path = project_dir / "Log.txt"
-    log_path.touch(exist_ok=True)
-
-    timestamp = now_iso()[:16].replace("T", " ")
-    line = f"[{timestamp}] STAGE → {stage}"
-    if message:
-        line += f" | {message}"
-
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
\ No newline at end of file